@@ -5,18 +5,21 @@ from .controller import Bomberman
 from .view import View
 from .settings_loader import load_settings
 
-HEAD_X = 150
 HEAD_Y = 17
 BLOCK_L = 10
 
 def main():
-    pyxel.init(150, 147, title="Bomberman Clone", fps=30, quit_key = pyxel.KEY_NONE)
+    settings = load_settings()
+    cols = settings.get("board_cols", 15)
+    rows = settings.get("board_rows", 13)
+    head_x = cols * BLOCK_L # 150 on the standard 15x13 board
+
+    pyxel.init(head_x, HEAD_Y + rows * BLOCK_L, title="Bomberman Clone", fps=30, quit_key = pyxel.KEY_NONE)
     pyxel.load("sprites.pyxres")
     
-    settings = load_settings()
-    model = Model(HEAD_Y, BLOCK_L)
+    model = Model(HEAD_Y, BLOCK_L, cols=cols, rows=rows)
     bots = Bots(model)
-    view = View(HEAD_X, HEAD_Y, BLOCK_L)
+    view = View(head_x, HEAD_Y, BLOCK_L, cols, rows)
     controller = Bomberman(model, bots, view, settings, fps=30)
 
     pyxel.run(controller.update, controller.draw)
@@ -0,0 +1,293 @@
+# pyright: strict
+import argparse, contextlib, io, json, os, random, sys, time, tracemalloc
+from typing import Any, Callable
+from .clock import TickClock
+from .model import Model, Bots
+from .engine import Engine
+from .headless import HEAD_Y, BLOCK_L, FPS
+from .snapshot import take_snapshot, restore_snapshot
+
+BASELINE = os.path.join(os.path.dirname(__file__), "bench_baseline.json")
+
+Step = Callable[[], None]
+
+class Scenario:
+    # a seeded board: soft block percent, bot lineup and optional pile of bombs
+    def __init__(self, soft_percent: int, bot_types: list[str], bombs: int = 0, seed: int = 0, cols: int = 15, rows: int = 13):
+        settings: dict[str, Any] = {
+            "soft_block_percent": soft_percent,
+            "powerup_percent": 75,
+            "timer_seconds": 180,
+            "human_player_number": 0,
+            "total_player_number": len(bot_types),
+            "bot_types": bot_types,
+            "rounds_to_win": 3,
+        }
+        self.model = Model(HEAD_Y, BLOCK_L, FPS, clock=TickClock(), cols=cols, rows=rows)
+        self.bots = Bots(self.model)
+        self.engine = Engine(self.model, self.bots, settings, seed)
+        self.bots.unthrottle()
+        self.rng = random.Random(seed)
+        self.soft_percent = soft_percent
+        self.bomb_cells: list[tuple[int, int]] = []
+        if bombs:
+            self.scatter_bombs(bombs)
+
+    def free_cells(self) -> list[tuple[int, int]]:
+        m = self.model
+        taken = set(m.soft_block_coords) | set(m.all_bombs)
+        return sorted(c for c in m.walkable_coords if c not in taken)
+
+    def scatter_bombs(self, n: int) -> None:
+        # every bomb gets the same fuse, so they all go off in one tick
+        m = self.model
+        cells = self.free_cells()
+        self.bomb_cells = self.rng.sample(cells, min(n, len(cells)))
+        for p in m.sprite_coords:
+            m.max_bombs_per_p[p] = n
+            m.exp_range_per_p[p] = 3
+        owners = list(m.sprite_coords)
+        for k, (x, y) in enumerate(self.bomb_cells):
+            p = owners[k % len(owners)]
+            saved = m.sprite_coords[p]
+            m.sprite_coords[p] = [x, y]
+            m.place_bomb(p)
+            m.sprite_coords[p] = saved
+
+class Bench:
+    def __init__(self, name: str, setup: Callable[[], tuple[Step | None, Step]], ops: int, repeats: int = 1):
+        # setup builds a fresh scenario and returns (untimed prepare step, timed step)
+        self.name = name
+        self.setup = setup
+        self.ops = ops
+        self.repeats = repeats
+
+class Result:
+    def __init__(self, name: str, samples: list[int], kib_per_op: float):
+        samples.sort()
+        self.name = name
+        self.ops = len(samples)
+        self.total_s = sum(samples) / 1e9
+        self.ops_per_sec = self.ops / self.total_s if self.total_s else 0.0
+        self.p50_us = samples[len(samples) // 2] / 1e3
+        self.p99_us = samples[min(len(samples) - 1, len(samples) * 99 // 100)] / 1e3
+        self.max_us = samples[-1] / 1e3
+        self.kib_per_op = kib_per_op
+
+    def to_json(self) -> dict[str, float]:
+        return {"ops_per_sec": self.ops_per_sec, "p50_us": self.p50_us, "p99_us": self.p99_us, "kib_per_op": self.kib_per_op}
+
+def run_bench(bench: Bench, ops_scale: float = 1.0) -> Result:
+    ops = max(1, int(bench.ops * ops_scale))
+    samples: list[int] = []
+    clock = time.perf_counter_ns
+    for _ in range(bench.repeats):
+        prepare, step = bench.setup()
+        for _ in range(ops):
+            if prepare is not None:
+                prepare()
+            t = clock()
+            step()
+            samples.append(clock() - t)
+
+    # second, shorter pass under tracemalloc, it slows everything down so it is not timed
+    prepare, step = bench.setup()
+    worst = 0
+    tracemalloc.start()
+    for _ in range(min(ops, 200)):
+        if prepare is not None:
+            prepare()
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        step()
+        _, peak = tracemalloc.get_traced_memory()
+        worst = max(worst, peak - before)
+    tracemalloc.stop()
+
+    return Result(bench.name, samples, worst / 1024)
+
+"""benchmarks"""
+
+def game_state(soft: int, bombs: int = 20, cols: int = 15, rows: int = 13) -> Callable[[], tuple[Step | None, Step]]:
+    def setup() -> tuple[Step | None, Step]:
+        s = Scenario(soft, ["greedy"] * 4, bombs=bombs, cols=cols, rows=rows)
+        return None, s.model.update_game_state
+    return setup
+
+def update_bots(soft: int, bot_type: str = "greedy") -> Callable[[], tuple[Step | None, Step]]:
+    def setup() -> tuple[Step | None, Step]:
+        s = Scenario(soft, [bot_type] * 4)
+        def prepare() -> None:
+            s.model.update_game_state()
+            s.model.clock.tick()
+        return prepare, s.bots.update_bots
+    return setup
+
+def bot_path(soft: int, cols: int = 15, rows: int = 13) -> Callable[[], tuple[Step | None, Step]]:
+    def setup() -> tuple[Step | None, Step]:
+        s = Scenario(soft, ["greedy"] * 4, cols=cols, rows=rows)
+        goals = s.free_cells()
+        p = 1
+        state = {"k": 0}
+        def prepare() -> None:
+            # drop the cached field so every op is a real search
+            if p in s.bots.fields:
+                s.bots.fields[p].key = None
+        def step() -> None:
+            s.bots.make_bot_path(p, goals[state["k"] % len(goals)])
+            state["k"] += 7
+        return prepare, step
+    return setup
+
+def explode_chain(soft: int, cols: int = 15, rows: int = 13) -> Callable[[], tuple[Step | None, Step]]:
+    def setup() -> tuple[Step | None, Step]:
+        s = Scenario(soft, ["greedy"] * 4, cols=cols, rows=rows)
+        m = s.model
+        def prepare() -> None:
+            # a whole new round, so the danger map, fuses and owners don't carry over from the last op
+            m.reset_round(soft, 75, 180)
+            s.scatter_bombs(20)
+        def step() -> None:
+            m.apply_detonation(m.resolve_detonations(list(s.bomb_cells)))
+        return prepare, step
+    return setup
+
+def soft_blocks(soft: int) -> Callable[[], tuple[Step | None, Step]]:
+    def setup() -> tuple[Step | None, Step]:
+        s = Scenario(soft, ["greedy"] * 4)
+        m = s.model
+        def step() -> None:
+            m.generate_soft_blocks(soft)
+        return m.soft_block_coords.clear, step
+    return setup
+
+def map_roll(soft: int, cols: int = 15, rows: int = 13) -> Callable[[], tuple[Step | None, Step]]:
+    # what the map pool's worker does for every next round, rolled and checked
+    def setup() -> tuple[Step | None, Step]:
+        s = Scenario(soft, ["greedy"] * 4, cols=cols, rows=rows)
+        pool = s.model.maps
+        assert pool is not None
+        def step() -> None:
+            pool.generate()
+        return None, step
+    return setup
+
+def full_round(soft: int, players: int = 4, cols: int = 15, rows: int = 13) -> Callable[[], tuple[Step | None, Step]]:
+    def setup() -> tuple[Step | None, Step]:
+        s = Scenario(soft, ["greedy"] * players, cols=cols, rows=rows)
+        e = s.engine
+        def step() -> None:
+            e.step(escape=e.model.round_transition_active)
+        return None, step
+    return setup
+
+def snapshot_roundtrip(soft: int, with_rng: bool) -> Callable[[], tuple[Step | None, Step]]:
+    def setup() -> tuple[Step | None, Step]:
+        s = Scenario(soft, ["greedy"] * 4, bombs=10)
+        m = s.model
+        def step() -> None:
+            restore_snapshot(m, take_snapshot(m, with_rng))
+        return None, step
+    return setup
+
+BENCHES: list[Bench] = [
+    Bench("update_game_state/empty+20bombs", game_state(0), ops=150, repeats=5),
+    Bench("update_game_state/soft30+20bombs", game_state(30), ops=150, repeats=5),
+    Bench("update_game_state/soft90+20bombs", game_state(90), ops=150, repeats=5),
+    Bench("update_bots/greedy4/empty", update_bots(0), ops=1000),
+    Bench("update_bots/greedy4/soft30", update_bots(30), ops=1000),
+    Bench("update_bots/planner4/soft30", update_bots(30, "planner"), ops=300),
+    Bench("make_bot_path/empty", bot_path(0), ops=1000),
+    Bench("make_bot_path/soft30", bot_path(30), ops=1000),
+    Bench("explode/chain20/soft30", explode_chain(30), ops=200),
+    Bench("generate_soft_blocks/soft30", soft_blocks(30), ops=500),
+    Bench("generate_soft_blocks/soft90", soft_blocks(90), ops=500),
+    Bench("round/greedy4/soft30", full_round(30), ops=6000),
+    # big maps: each engine on its own stays around a millisecond (one path search, the game state update with
+    # its blasts and danger map, a chain of blasts, the next round's map on the pool worker); a whole tick with
+    # 16 greedy bots does not at p99, every bot that decides that tick runs its own depth 24 search, and the
+    # round's first tick has all 16 choosing at once
+    Bench("update_game_state/soft30+80bombs/101x101", game_state(30, 80, 101, 101), ops=150, repeats=5),
+    Bench("make_bot_path/soft30/101x101", bot_path(30, 101, 101), ops=1000),
+    Bench("explode/chain20/soft30/101x101", explode_chain(30, 101, 101), ops=200),
+    Bench("map_roll/soft30/101x101", map_roll(30, 101, 101), ops=200),
+    Bench("round/greedy16/soft30/101x101", full_round(30, 16, 101, 101), ops=1500),
+    Bench("snapshot/roundtrip/soft30+10bombs", snapshot_roundtrip(30, True), ops=2000),
+    Bench("snapshot/roundtrip-no-rng/soft30+10bombs", snapshot_roundtrip(30, False), ops=2000),
+]
+
+def compare(results: list[Result], baseline: dict[str, dict[str, float]], tolerance: float,
+        p99_tolerance: float, kib_tolerance: float) -> list[str]:
+    regressions: list[str] = []
+    for r in results:
+        if r.name not in baseline:
+            continue
+        base = baseline[r.name]
+        old = base["ops_per_sec"]
+        if old and r.ops_per_sec < old * (1 - tolerance):
+            regressions.append(f"{r.name}: {r.ops_per_sec:.0f} ops/s vs baseline {old:.0f}")
+        old = base.get("p99_us", 0.0)
+        if old and r.p99_us > old * (1 + p99_tolerance):
+            regressions.append(f"{r.name}: p99 {r.p99_us:.1f} us vs baseline {old:.1f}")
+        # allocation is near exact run to run, the 1 KiB is for benches that allocate next to nothing
+        old = base.get("kib_per_op", 0.0)
+        if r.kib_per_op > old * (1 + kib_tolerance) + 1:
+            regressions.append(f"{r.name}: {r.kib_per_op:.1f} KiB/op vs baseline {old:.1f}")
+    return regressions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Headless throughput benchmarks for Model and Bots.")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed ops/s drop before it counts as a regression")
+    parser.add_argument("--p99-tolerance", type=float, default=0.5, help="allowed p99 rise, looser since the tail is noisy")
+    parser.add_argument("--kib-tolerance", type=float, default=0.25, help="allowed KiB/op rise")
+    parser.add_argument("--quick", action="store_true", help="a tenth of the ops, for a smoke run, not compared to the baseline")
+    args = parser.parse_args()
+    if args.quick and args.save_baseline:
+        parser.error("--save-baseline needs a full run")
+
+    scale = 0.1 if args.quick else 1.0
+    results: list[Result] = []
+    print(f"{'benchmark':40} {'ops/s':>10} {'p50 us':>9} {'p99 us':>9} {'max us':>9} {'KiB/op':>9}")
+    for bench in BENCHES:
+        if args.filter not in bench.name:
+            continue
+        # the game prints a lot from the bots, keep it out of the table
+        with contextlib.redirect_stdout(io.StringIO()):
+            r = run_bench(bench, scale)
+        results.append(r)
+        print(f"{r.name:40} {r.ops_per_sec:10.0f} {r.p50_us:9.1f} {r.p99_us:9.1f} {r.max_us:9.1f} {r.kib_per_op:9.1f}")
+
+    if args.save_baseline:
+        data: dict[str, dict[str, float]] = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                data = json.load(f)
+        data.update({r.name: r.to_json() for r in results})
+        with open(args.baseline, "w") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        print(f"baseline saved to {args.baseline}")
+        return
+
+    if args.quick:
+        # fewer ops have a different p99 and more warmup in them, the full run baseline doesn't apply
+        return
+
+    if not os.path.exists(args.baseline):
+        print("no baseline yet, run with --save-baseline")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance, args.p99_tolerance, args.kib_tolerance)
+    if regressions:
+        print("regressions:")
+        for line in regressions:
+            print("  " + line)
+        sys.exit(1)
+    print("no regressions against baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# pyright: strict
+from array import array
+from collections.abc import MutableSet
+from typing import Any, Iterable, Iterator
+
+# per cell flags, one byte per cell
+WALL = 1
+HARD = 2
+SOFT = 4
+BOMB = 8
+FIRE = 16 # explosion currently on this cell
+DANGER = 32 # a placed bomb will reach this cell
+WALKABLE = 64 # inside the walls and not a hard block
+
+SOLID = WALL | HARD
+
+# reach tables by board width and wall/hard block layout, the real board, planner scratch boards
+# and every round of a match have the same layout so they all share one
+_reach_tables: dict[tuple[int, bytes], "array[int]"] = {}
+
+class Board:
+    # the whole map as a bytearray indexed by cell, coords stay in pixels outside this class
+    def __init__(self, cols: int, rows: int, block_l: int, y_origin: int):
+        self.cols = cols
+        self.rows = rows
+        self.block_l = block_l
+        self.y_origin = y_origin
+        self.size = cols * rows
+        self.flags = bytearray(self.size)
+        self.counts: dict[int, int] = {WALL: 0, HARD: 0, SOFT: 0, BOMB: 0, FIRE: 0, DANGER: 0, WALKABLE: 0}
+        self.version: int = 0 # bumped on every change, for caches like the bots' distance fields
+        self._tables: dict[tuple[int, bool], bytes] = {}
+        # right, left, down, up
+        self.steps = (1, -1, cols, -cols)
+        self._reach: array[int] | None = None
+
+    def index(self, coord: tuple[int, int]) -> int:
+        # -1 if off the board or not aligned to a cell
+        x, y = coord
+        y -= self.y_origin
+        bl = self.block_l
+        if x % bl or y % bl:
+            return -1
+        cx = x // bl
+        cy = y // bl
+        if 0 <= cx < self.cols and 0 <= cy < self.rows:
+            return cy * self.cols + cx
+        return -1
+
+    def coord(self, i: int) -> tuple[int, int]:
+        cy, cx = divmod(i, self.cols)
+        return (cx * self.block_l, cy * self.block_l + self.y_origin)
+
+    def has(self, i: int, flag: int) -> bool:
+        return i >= 0 and bool(self.flags[i] & flag)
+
+    def set(self, i: int, flag: int) -> None:
+        if not self.flags[i] & flag:
+            self.flags[i] |= flag
+            self.counts[flag] += 1
+            self.version += 1
+            if flag & SOLID:
+                self._reach = None
+
+    def clear(self, i: int, flag: int) -> bool:
+        # True if the flag was there
+        if self.flags[i] & flag:
+            self.flags[i] &= ~flag
+            self.counts[flag] -= 1
+            self.version += 1
+            if flag & SOLID:
+                self._reach = None
+            return True
+        return False
+
+    @property
+    def reach(self) -> "array[int]":
+        # reach[c * 4 + d] = open cells from c in direction d before the first wall or hard block
+        # walls and hard blocks never change during a round, so this is built once with the map
+        if self._reach is None:
+            self.build_reach()
+        return self._reach # type: ignore
+
+    def build_reach(self) -> None:
+        # a stop offset per ray instead of the cells, 8 bytes a cell however big the board is
+        solid = bytes(self.flags.translate(self.table(SOLID, True)))
+        key = (self.cols, solid)
+        reach = _reach_tables.get(key)
+        if reach is None:
+            size = self.size
+            reach = array("H", [0]) * (size * 4)
+            for d, step in enumerate(self.steps):
+                # against the direction, so a cell's neighbour is already done
+                for c in (range(size - 1, -1, -1) if step > 0 else range(size)):
+                    n = c + step
+                    if not solid[c] and 0 <= n < size and not solid[n]:
+                        reach[c * 4 + d] = reach[n * 4 + d] + 1
+            if len(_reach_tables) >= 8:
+                _reach_tables.clear()
+            _reach_tables[key] = reach
+        self._reach = reach
+
+    def ray(self, c: int, d: int, rng: int) -> range:
+        # cells a range rng blast from c covers in direction d, soft blocks are up to the caller
+        step = self.steps[d]
+        return range(c + step, c + step * (min(self.reach[c * 4 + d], rng) + 1), step)
+
+    def table(self, flag: int, mark: bool) -> bytes:
+        # translate tables, mark=True maps a byte to 1/0 by flag, mark=False drops the flag
+        key = (flag, mark)
+        if key not in self._tables:
+            if mark:
+                self._tables[key] = bytes(1 if f & flag else 0 for f in range(256))
+            else:
+                self._tables[key] = bytes(f & ~flag & 0xFF for f in range(256))
+        return self._tables[key]
+
+    def clear_flag(self, flag: int) -> None:
+        if not self.counts[flag]:
+            return
+        self.flags[:] = self.flags.translate(self.table(flag, False))
+        self.counts[flag] = 0
+        self.version += 1
+        if flag & SOLID:
+            self._reach = None
+
+    def cells(self, flag: int) -> Iterator[int]:
+        if not self.counts[flag]:
+            return
+        # the scan itself runs in C, python only touches the matching cells
+        marks = self.flags.translate(self.table(flag, True))
+        i = marks.find(1)
+        while i != -1:
+            yield i
+            i = marks.find(1, i + 1)
+
+class CellSet(MutableSet[tuple[int, int]]):
+    # set of pixel coords backed by one flag of the board, so View and Bots can keep using sets
+    def __init__(self, board: Board, flag: int):
+        self.board = board
+        self.flag = flag
+
+    @classmethod
+    def _from_iterable(cls, it: Iterable[Any]) -> set[Any]:
+        # results of -, &, | are plain sets
+        return set(it)
+
+    def __contains__(self, coord: object) -> bool:
+        if not isinstance(coord, tuple):
+            return False
+        return self.board.has(self.board.index(coord), self.flag) # type: ignore
+
+    def __iter__(self) -> Iterator[tuple[int, int]]:
+        coord = self.board.coord
+        for i in self.board.cells(self.flag):
+            yield coord(i)
+
+    def __len__(self) -> int:
+        return self.board.counts[self.flag]
+
+    def add(self, value: tuple[int, int]) -> None:
+        i = self.board.index(value)
+        if i < 0:
+            raise ValueError(f"{value} is not a cell of the board")
+        self.board.set(i, self.flag)
+
+    def discard(self, value: tuple[int, int]) -> None:
+        i = self.board.index(value)
+        if i >= 0:
+            self.board.clear(i, self.flag)
+
+    def clear(self) -> None:
+        self.board.clear_flag(self.flag)
+
+    def copy(self) -> set[tuple[int, int]]:
+        return set(self)
+
+    def __repr__(self) -> str:
+        return f"CellSet({set(self)!r})"
@@ -0,0 +1,9 @@
+# pyright: strict
+
+class TickClock:
+    # logical frame counter, replaces pyxel.frame_count so the model runs without a window
+    def __init__(self, start: int = 0):
+        self.frame_count: int = start
+
+    def tick(self) -> None:
+        self.frame_count += 1
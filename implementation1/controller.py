@@ -1,7 +1,14 @@
 # pyright: strict
+import time
 import pyxel
 from .model import Model, Bots
 from .view import View
+from .engine import Engine, KEY_UP, KEY_DOWN, KEY_LEFT, KEY_RIGHT, KEY_BOMB
+from .replay import InputRecorder
+from .settings_loader import SPECTATOR_SPEEDS
+from .timestep import FixedTimestep
+from .telemetry import FrameTimes
+from .profiling import RoundProfiler
 
 class Bomberman:
     def __init__(self, model: Model, bots: Bots, view: View, settings: dict[str, int], fps: int=30):
@@ -19,110 +26,141 @@ class Bomberman:
         # phase 4
         self.bots = bots
 
-        self.model.start_game_timer(self.timer_seconds)
-        self.model.generate_walls()
-        self.model.generate_hard_blocks()
-        self.model.generate_walkable_coords()
-        
-        # self.model.generate_sprites(self.player_number)
-        self.model.generate_sprites(self.total_player_number)
-        
-        # may type ignore kasi ang kulet ng pylance dinedetect sya as int
-        self.bots.set_bots(self.total_player_number, self.human_player_number, self.bot_types) # type: ignore
-
-        self.model.generate_soft_blocks(self.soft_block_percent)
-
-        self.model.powerup_percent = self.powerup_percent
-
-        self.model.setting_up(self.total_player_number, self.rounds_to_win) # phase 5a
+        # setup and game rules live in the engine so they also run headless
+        # the bots keep their frame budget while recording, the replay gets what it decided each tick
+        recorder = InputRecorder() if self.settings.get("record_inputs") else None
+        self.engine = Engine(self.model, self.bots, self.settings, recorder=recorder)
+
+        # spectator turbo, ticks per drawn frame once no human is left on the board
+        self.fps = fps
+        self.speed: int = self.settings.get("spectator_speed", 1)
+
+        # game ticks at a steady 30 Hz even when a frame runs long
+        self.timestep = FixedTimestep(fps)
+        self.held_bombs: list[int] = [0] * self.human_player_number # presses from frames that ran no tick
+        self.held_escape: bool = False
+
+        # where each frame's time goes, shown in live debug mode, T saves it as csv
+        self.timings = FrameTimes()
+        self.model.timings = self.timings
+        self.bots.timings = self.timings
+        self.bots.paced = True
+
+    # other way to link the keys so easier to add more players
+    PLAYER_KEYS: dict[int, dict[str, int]] = {
+        0: {
+            "up": pyxel.KEY_UP,
+            "down": pyxel.KEY_DOWN,
+            "left": pyxel.KEY_LEFT,
+            "right": pyxel.KEY_RIGHT,
+            "bomb": pyxel.KEY_SPACE,
+        },
+        1: {
+            "up": pyxel.KEY_W,
+            "down": pyxel.KEY_S,
+            "left": pyxel.KEY_A,
+            "right": pyxel.KEY_D,
+            "bomb": pyxel.KEY_X,
+        },
+    }
+
+    def read_keys(self) -> list[int]:
+        keys: list[int] = []
+        for p in range(self.human_player_number):
+            k = self.PLAYER_KEYS[p]
+            bits = 0
+            if pyxel.btn(k["up"]):
+                bits |= KEY_UP
+            if pyxel.btn(k["down"]):
+                bits |= KEY_DOWN
+            if pyxel.btn(k["left"]):
+                bits |= KEY_LEFT
+            if pyxel.btn(k["right"]):
+                bits |= KEY_RIGHT
+            if pyxel.btnp(k["bomb"]):
+                bits |= KEY_BOMB
+            keys.append(bits)
+        return keys
+
+    def profile_round(self) -> None:
+        # P: profile from now until this round ends
+        if self.engine.profiler is None:
+            self.engine.profiler = RoundProfiler(set())
+        if not self.engine.profiler.active:
+            self.engine.profiler.capture_current()
+            print(f"profiling round {self.model.round_number}")
+
+    def spectating(self) -> bool:
+        return not any(p in self.model.sprite_coords for p in range(self.human_player_number))
+
+    def change_speed(self) -> None:
+        k = SPECTATOR_SPEEDS.index(self.speed)
+        if pyxel.btnp(pyxel.KEY_EQUALS) and k + 1 < len(SPECTATOR_SPEEDS):
+            self.speed = SPECTATOR_SPEEDS[k + 1]
+        if pyxel.btnp(pyxel.KEY_MINUS) and k > 0:
+            self.speed = SPECTATOR_SPEEDS[k - 1]
 
     def update(self) -> None:
-        # transition/countdown - phase 5d pero mali ata oops
-        if self.model.round_transition_active:
-            # ESC to skip transition
-            if pyxel.btnp(pyxel.KEY_ESCAPE):
-                if self.model.overall_game_over:
-                    return
-                self.model.round_transition_active = False
-                self.model.round_end_frame = None
-                self.model.round_winner = None
-                if not self.model.overall_game_over:
-                    self.model.reset_round(
-                        self.soft_block_percent,
-                        self.powerup_percent,
-                        self.timer_seconds
-                    )
-                    self.model.start_countdown()
-                    self.model.round_number += 1
-            return
-        
-        if not self.model.countdown_finished:
-            self.model.countdown()
-            return
-        
-        elif not self.model.round_transition_active and pyxel.btnp(pyxel.KEY_ESCAPE):
-            self.model.toggle_live_debug_mode()
-
-        if self.model.overall_game_over:
+        self.timings.mark()
+        keys = self.read_keys()
+        escape = pyxel.btnp(pyxel.KEY_ESCAPE) or self.held_escape
+        if pyxel.btnp(pyxel.KEY_P):
+            self.profile_round()
+        self.timings.lap("input")
+        for p, held in enumerate(self.held_bombs):
+            keys[p] |= held
+
+        ticks = self.timestep.advance(time.perf_counter())
+        if ticks == 0:
+            # presses are only seen for one frame, keep them for the next tick
+            self.held_bombs = [bits & KEY_BOMB for bits in keys]
+            self.held_escape = escape
             return
-        
-        # other way to link the keys so easier to add more players
-        PLAYER_KEYS: dict[int, dict[str, int]] = {
-            0: {
-                "up": pyxel.KEY_UP,
-                "down": pyxel.KEY_DOWN,
-                "left": pyxel.KEY_LEFT,
-                "right": pyxel.KEY_RIGHT,
-                "bomb": pyxel.KEY_SPACE,
-            },
-            1: {
-                "up": pyxel.KEY_W,
-                "down": pyxel.KEY_S,
-                "left": pyxel.KEY_A,
-                "right": pyxel.KEY_D,
-                "bomb": pyxel.KEY_X,  
-            },
-        }
-
-        # loop over all active players
-        for p in self.model.sprite_coords:
-            if p in self.bots.bot_players:
+        self.held_bombs = [0] * self.human_player_number
+        self.held_escape = False
+
+        spectating = self.spectating()
+        if spectating:
+            self.change_speed()
+        # turbo runs more ticks per draw, only the last one is drawn
+        # the extra ticks stop at the end of a round so the results still show, or when the frame is used up
+        start = time.perf_counter()
+        self.bots.begin_frame()
+        for k in range(ticks * self.speed if spectating else ticks):
+            was_in_transition = self.model.round_transition_active
+            self.engine.step(keys, escape)
+            # a press is one tick, the rest of the catch-up only sees held keys
+            if k == 0:
+                keys = [bits & ~KEY_BOMB for bits in keys]
+                escape = False
+            if k + 1 < ticks:
                 continue
+            if self.model.round_transition_active != was_in_transition:
+                break
+            if time.perf_counter() - start > 0.8 / self.fps:
+                break
 
-            keys = PLAYER_KEYS[p]
-
-            up = pyxel.btn(keys["up"])
-            down = pyxel.btn(keys["down"])
-            left = pyxel.btn(keys["left"])
-            right = pyxel.btn(keys["right"])
-
-            # para di magsnap if dalawang keys pressed
-            diagonal = (up or down) and (left or right)
-            self.model.set_diagonal(diagonal)
-
-            if up:
-                self.model.move_up(p)
-            if down:
-                self.model.move_down(p)
-            if left:
-                self.model.move_left(p)
-            if right:
-                self.model.move_right(p)
-
-            # bomb
-            if pyxel.btnp(keys["bomb"]):
-                self.model.place_bomb(p)
 
-        self.model.update_game_state()
-        self.bots.update_bots()
-
-        if self.model.game_over:
-            self.model.handle_round_end(self.soft_block_percent, self.powerup_percent, self.timer_seconds)
-
-        # self.bots._update_bots()
+    def draw(self) -> None:
+        # timed so the bot scheduler knows how much of the frame is left for thinking
+        # behind on ticks: the last drawn frame stays on screen, counted in timestep.skipped
+        if not self.timestep.should_draw():
+            self.timings.end_frame()
+            return
+        start = time.perf_counter()
+        self.timings.mark()
+        self.draw_frame()
+        self.bots.scheduler.note_draw(time.perf_counter() - start)
+        self.timings.end_frame()
 
+        if self.model.live_debug_mode:
+            self.view.draw_timings(self.timings.stats(), self.timestep.skipped)
+            if pyxel.btnp(pyxel.KEY_T):
+                path = self.timings.export_csv(f"telemetry/frames-{self.engine.seed}-{self.timings.count}.csv")
+                print(f"frame times saved to {path}")
 
-    def draw(self):
+    def draw_frame(self):
+        t = self.timings
         # for  transition
         if self.model.round_transition_active:
             # draw the transition screen (no game objects)
@@ -132,34 +170,43 @@ class Bomberman:
                 self.model.round_wins,          # scores
                 # pachec
         )
+            t.lap("view.transition")
             return  
         
-        self.view.draw_background()
-        self.view.walls(self.model.wall_coords)
-        self.view.hard_blocks(self.model.hard_block_coords)
-        self.view.soft_blocks(self.model.soft_block_coords)   
+        self.view.draw_board(self.model.map_version, self.model.wall_coords, self.model.hard_block_coords,
+            self.model.soft_block_coords, self.model.take_soft_cleared())
+        t.lap("view.board")
 
         self.view.bomb(self.model.all_bombs)
+        t.lap("view.bombs")
         self.view.explosions(self.model.explosions)
+        t.lap("view.fire")
         
         if self.model.live_debug_mode:
             self.view.bot_type(self.model.sprite_coords, self.bots.bot_players)
             self.view.bot_state(self.model.sprite_coords, self.bots.bot_states)
             self.view.bot_danger(self.model.sprite_coords, self.bots.bot_danger_rads)
             self.view.bot_paths(self.bots.bot_paths, self.model.block_l)
+            t.lap("view.debug")
 
         self.view.powerups(self.model.powerups)               
+        t.lap("view.powerups")
         self.view.sprites(self.model.sprite_coords)
+        t.lap("view.sprites")
 
         if not self.model.countdown_finished:
             self.view.draw_timer(self.timer_seconds)
             self.view.draw_countdown(self.model.countdown_time)
+            t.lap("view.header")
             return
         
         self.view.draw_sprite_scores(self.model.round_wins)
+        if self.speed > 1 and self.spectating():
+            self.view.draw_speed(self.speed)
 
         if not self.model.game_over and self.model.countdown_finished:
             self.view.draw_timer(self.model.remaining_time())
             
         if self.model.game_over:
             self.view.draw_game_over(self.model.game_over_text)
+        t.lap("view.header")
@@ -0,0 +1,147 @@
+# pyright: strict
+import heapq
+from array import array
+from .board import Board, SOFT, DANGER
+
+NEVER = 2**31 - 1
+
+class DangerMap:
+    # earliest game tick each cell will be on fire, from the bombs currently on the board
+    # a bomb inside another bomb's blast goes off with it, so it inherits the earlier tick
+    # errs on the early side: a cell may be marked that in the end doesn't burn, never the other way
+    def __init__(self, board: Board):
+        self.board = board
+        self.fire_at = array("i", [NEVER]) * board.size
+        self.bombs: dict[int, tuple[int, int]] = {} # cell -> (own detonation tick, blast range)
+        self.trigger: dict[int, int] = {} # cell -> tick it actually goes off, after chains
+        self.touched: list[int] = [] # cells with a finite fire_at, so a rebuild doesn't scan the board
+        self.dirty: bool = False
+        self.hits: dict[int, tuple[tuple[int, int], ...]] = {} # soft block -> earliest (tick, bomb) reaching it, see propagate
+        self.stopped: dict[int, tuple[int, ...]] = {} # soft block -> bombs whose ray ends there
+
+    def blast_cells(self, c: int, rng: int) -> list[int]:
+        # walls and hard blocks are already cut off by the reach table, only soft blocks are checked
+        flags = self.board.flags
+        ray = self.board.ray
+        cells = [c]
+        for d in range(4):
+            for pos in ray(c, d, rng):
+                cells.append(pos)
+                if flags[pos] & SOFT:
+                    break
+        return cells
+
+    def add_bomb(self, c: int, tick: int, rng: int) -> None:
+        # a new bomb only makes triggers earlier and opens more soft blocks, so it is spread from its own blast
+        # instead of working out the whole map again
+        self.bombs[c] = (tick, rng)
+        if self.dirty:
+            self.rebuild()
+            return
+        self.propagate([(min(tick, self.fire_at[c]), c)])
+
+    def mark(self, pos: int, t: int) -> None:
+        fire_at = self.fire_at
+        if t < fire_at[pos]:
+            if fire_at[pos] == NEVER:
+                self.touched.append(pos)
+                self.board.set(pos, DANGER)
+            fire_at[pos] = t
+
+    @staticmethod
+    def passes(hits: dict[int, tuple[tuple[int, int], ...]], pos: int, b: int, own: int) -> bool:
+        # another bomb opens the soft block by the time b goes off at the latest
+        return any(q != b and when <= own for when, q in hits.get(pos, ()))
+
+    def propagate(self, work: list[tuple[int, int]]) -> None:
+        # resolve_detonations goes bomb by bomb, so a soft block blown up earlier in the chain or on an
+        # earlier tick doesn't stop the rays of the bombs after it, and which ray comes first depends on the order
+        # so a ray goes through a soft block if another bomb reaches that block no later than this bomb's
+        # own fuse, the latest it can go off
+        # work is (tick, bomb) to cast from; casting only ever makes a trigger earlier or opens a block, so the
+        # worklist runs dry on its own once nothing changes any more
+        flags = self.board.flags
+        ray = self.board.ray
+        bombs = self.bombs
+        trigger = self.trigger
+        hits = self.hits
+        stopped = self.stopped
+        heapq.heapify(work)
+
+        while work:
+            t, b = heapq.heappop(work)
+            if t > trigger.get(b, NEVER):
+                continue # went off earlier through another chain, cast from there already
+            trigger[b] = t
+            self.mark(b, t)
+            own, rng = bombs[b]
+            for d in range(4):
+                for pos in ray(b, d, rng):
+                    self.mark(pos, t)
+                    if pos in bombs and t < trigger.get(pos, NEVER):
+                        trigger[pos] = t
+                        heapq.heappush(work, (t, pos))
+                    if flags[pos] & SOFT:
+                        if self.hit(pos, t, b):
+                            # rays that stopped here may go through now
+                            for q in stopped.get(pos, ()):
+                                if q != b and self.passes(hits, pos, q, bombs[q][0]):
+                                    heapq.heappush(work, (trigger[q], q))
+                        if not self.passes(hits, pos, b, own):
+                            if b not in stopped.get(pos, ()):
+                                stopped[pos] = stopped.get(pos, ()) + (b,)
+                            break
+
+    def hit(self, pos: int, t: int, b: int) -> bool:
+        # keeps the two earliest different bombs reaching a soft block, True if that changed
+        # tuples are replaced, never changed, so a snapshot can share them
+        first = self.hits.get(pos, ())
+        for when, q in first:
+            if q == b and when <= t:
+                return False
+        kept = sorted([(when, q) for when, q in first if q != b] + [(t, b)])[:2]
+        if tuple(kept) == first:
+            return False
+        self.hits[pos] = tuple(kept)
+        return True
+
+    def remove_bomb(self, c: int) -> None:
+        if c in self.bombs:
+            del self.bombs[c]
+            self.trigger.pop(c, None)
+            self.dirty = True
+
+    def set_range(self, c: int, rng: int) -> None:
+        tick, old = self.bombs[c]
+        if old != rng:
+            self.bombs[c] = (tick, rng)
+            self.dirty = True
+
+    def clear_fire(self) -> None:
+        fire_at = self.fire_at
+        for pos in self.touched:
+            fire_at[pos] = NEVER
+        self.touched.clear()
+        self.trigger.clear()
+        self.board.clear_flag(DANGER)
+        self.dirty = False
+
+    def rebuild(self) -> None:
+        # after a bomb is gone, a soft block was destroyed or a range changed
+        self.clear_fire()
+        self.hits.clear()
+        self.stopped.clear()
+        self.propagate([(tick, c) for c, (tick, _) in self.bombs.items()])
+
+    def reset(self) -> None:
+        self.bombs.clear()
+        self.hits.clear()
+        self.stopped.clear()
+        self.clear_fire()
+
+    def refresh(self) -> None:
+        if self.dirty:
+            self.rebuild()
+
+    def at(self, c: int) -> int:
+        return self.fire_at[c] if c >= 0 else NEVER
@@ -0,0 +1,84 @@
+# pyright: strict
+import argparse, contextlib, os, random, sys
+from typing import Any
+from .board import FIRE, BOMB
+from .danger import NEVER
+from .model import Model, Bots
+from .engine import Engine
+from .headless import new_model
+
+# regression check for the danger map: random boards and bomb piles, every cell that catches fire
+# must have been predicted to burn on that tick or earlier, or bots walk into blasts they think are safe
+
+def check_seed(seed: int) -> tuple[int, int, int, int]:
+    # returns (cells that burned, burned earlier than predicted, of those predicted never,
+    # cells where adding the bombs one by one gave another tick than building the map from scratch)
+    rng = random.Random(seed)
+    settings: dict[str, Any] = {
+        "soft_block_percent": rng.choice((0, 30, 60, 90)),
+        "powerup_percent": 0,
+        "timer_seconds": 180,
+        "human_player_number": 0,
+        "total_player_number": 4,
+        "bot_types": ["greedy"] * 4,
+        "rounds_to_win": 3,
+    }
+    m = new_model(settings)
+    Engine(m, Bots(m), settings, seed)
+    board = m.board
+
+    # bombs with mixed ranges and fuses, so there are chains across ticks and through soft blocks
+    free = [c for c in m.walkable_coords if c not in m.soft_block_coords]
+    owners = list(m.sprite_coords)
+    for p in owners:
+        m.exp_range_per_p[p] = rng.randint(1, 5)
+        m.max_bombs_per_p[p] = 99
+    for coord in rng.sample(free, min(len(free), rng.randint(5, 40))):
+        p = rng.choice(owners)
+        m.all_bombs.add(coord)
+        m.fuses.add(coord, m.game_tick + rng.randint(1, 90))
+        m.bomb_owner[coord] = p
+        m.num_bombs_per_p[p] += 1
+        m.get_future_explosion_range(coord)
+    predicted = list(m.danger.fire_at)
+    m.danger.rebuild()
+    drift = sum(1 for a, b in zip(predicted, m.danger.fire_at) if a != b)
+
+    # same order as update_game_state, a cell is on fire from the tick its bomb went off
+    burned: dict[int, int] = {}
+    while board.counts[BOMB] or m.flames.active:
+        m.update_explosions()
+        m.update_bomb()
+        for c in board.cells(FIRE):
+            if c not in burned:
+                burned[c] = m.game_tick
+        m.bomb_timer()
+
+    early = [c for c, t in burned.items() if t < predicted[c]]
+    never = [c for c in early if predicted[c] == NEVER]
+    return len(burned), len(early), len(never), drift
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check the danger map against where bombs really burn.")
+    parser.add_argument("--seeds", type=int, default=300)
+    args = parser.parse_args()
+
+    total = early = never = drift = 0
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        results = [check_seed(seed) for seed in range(args.seeds)]
+    for seed, (n, e, v, f) in enumerate(results):
+        total += n
+        early += e
+        never += v
+        drift += f
+        if e:
+            print(f"seed {seed}: {e} of {n} cells burned before the predicted tick, {v} predicted never")
+        if f:
+            print(f"seed {seed}: {f} cells differ between the incremental map and a rebuild")
+    print(f"{args.seeds} seeds, {total} burned cells, {early} earlier than predicted, {never} predicted never, "
+        f"{drift} differ from a rebuild")
+    if early or drift:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# pyright: strict
+import random, time
+from typing import Any, Sequence
+from .model import Model, Bots
+from .replay import InputRecorder
+from .profiling import RoundProfiler
+
+# input of one human player for one tick, packed as bits
+KEY_UP = 1
+KEY_DOWN = 2
+KEY_LEFT = 4
+KEY_RIGHT = 8
+KEY_BOMB = 16 # btnp, not btn
+
+class Engine:
+    # game loop without pyxel, the controller feeds it keys and the headless runner feeds it nothing
+    def __init__(self, model: Model, bots: Bots, settings: dict[str, Any], seed: int | None = None,
+            recorder: InputRecorder | None = None, profiler: RoundProfiler | None = None):
+        self.model = model
+        self.bots = bots
+        self.settings = settings
+
+        # a match is reproducible from its seed plus the recorded keys
+        self.seed: int = seed if seed is not None else random.randrange(2**32)
+        self.model.rng.seed(self.seed)
+        self.bots.rng.seed(self.seed ^ 0x9E3779B9)
+        self.recorder = recorder
+        if self.recorder is not None:
+            self.recorder.begin(self.seed, settings)
+
+        self.soft_block_percent: int = settings["soft_block_percent"]
+        self.powerup_percent: int = settings["powerup_percent"]
+        self.timer_seconds: int = settings["timer_seconds"]
+        self.human_player_number: int = settings["human_player_number"]
+        self.total_player_number: int = settings["total_player_number"]
+        self.bot_types: list[str] = settings["bot_types"]
+        self.rounds_to_win: int = settings["rounds_to_win"]
+        self.lineup: list[str] = ["human"] * self.human_player_number + list(self.bot_types) # per seat
+
+        # cProfile over whole rounds, one round from the settings or whatever the caller asks for
+        if profiler is None and "profile_round" in settings:
+            profiler = RoundProfiler({settings["profile_round"]})
+        self.profiler = profiler
+
+        self.model.start_game_timer(self.timer_seconds)
+        self.model.generate_walls()
+        self.model.generate_hard_blocks()
+        self.model.generate_walkable_coords()
+        self.model.generate_sprites(self.total_player_number)
+        self.bots.set_bots(self.total_player_number, self.human_player_number, self.bot_types)
+        self.model.start_maps(self.soft_block_percent)
+        self.model.powerup_percent = self.powerup_percent
+        self.model.setting_up(self.total_player_number, self.rounds_to_win)
+
+    @property
+    def tick(self) -> int:
+        return self.model.clock.frame_count
+
+    def step(self, keys: Sequence[int] = (), escape: bool = False) -> None:
+        # one frame of the game, then the clock moves (same as pyxel.frame_count after update)
+        was_in_transition = self.model.round_transition_active
+        profiler = self.profiler
+        if profiler is not None and not profiler.active and profiler.wants(self.model):
+            profiler.start(self.model)
+        start = time.perf_counter()
+        self.update(keys, escape)
+        self.bots.scheduler.end_frame(time.perf_counter() - start)
+        if self.recorder is not None:
+            # after the update, the bots' wall clock decisions are inputs too
+            self.recorder.record(keys, escape, *self.bots.pacing())
+        self.model.clock.tick()
+
+        # handle_round_end just ran
+        if self.model.round_transition_active and not was_in_transition:
+            if profiler is not None and profiler.active:
+                path = profiler.finish(self.model, self.seed, self.lineup)
+                print(f"profile of round {profiler.round_number} saved to {path}")
+            # flush at every round end, the window can be closed at any time
+            if self.recorder is not None:
+                self.recorder.save(self.model)
+
+    def update(self, keys: Sequence[int], escape: bool) -> None:
+        # transition screen, ESC skips it
+        if self.model.round_transition_active:
+            if escape:
+                if self.model.overall_game_over:
+                    return
+                self.model.round_transition_active = False
+                self.model.round_end_frame = None
+                self.model.round_winner = None
+                if not self.model.overall_game_over:
+                    self.model.reset_round(
+                        self.soft_block_percent,
+                        self.powerup_percent,
+                        self.timer_seconds
+                    )
+                    self.model.start_countdown()
+                    self.model.round_number += 1
+            return
+
+        if not self.model.countdown_finished:
+            self.model.countdown()
+            return
+
+        elif escape:
+            self.model.toggle_live_debug_mode()
+
+        if self.model.overall_game_over:
+            return
+
+        # loop over all active players
+        for p in self.model.sprite_coords:
+            if p in self.bots.bot_players:
+                continue
+
+            bits = keys[p] if p < len(keys) else 0
+            self.apply_input(p, bits)
+
+        self.model.update_game_state()
+        self.bots.update_bots()
+
+        if self.model.game_over:
+            self.model.handle_round_end(self.soft_block_percent, self.powerup_percent, self.timer_seconds)
+
+    def apply_input(self, p: int, bits: int) -> None:
+        up = bits & KEY_UP
+        down = bits & KEY_DOWN
+        left = bits & KEY_LEFT
+        right = bits & KEY_RIGHT
+
+        # so it doesn't snap when two keys are pressed
+        diagonal = bool((up or down) and (left or right))
+        self.model.set_diagonal(diagonal)
+
+        if up:
+            self.model.move_up(p)
+        if down:
+            self.model.move_down(p)
+        if left:
+            self.model.move_left(p)
+        if right:
+            self.model.move_right(p)
+
+        if bits & KEY_BOMB:
+            self.model.place_bomb(p)
@@ -0,0 +1,60 @@
+# pyright: strict
+from array import array
+from collections import deque
+from .board import Board, FIRE
+
+class Blast:
+    def __init__(self, expires: int, cells: list[int], soft_blocks: list[int]):
+        self.expires = expires
+        self.cells = cells
+        self.soft_blocks = soft_blocks # destroyed by this blast, powerups may spawn here when it ends
+
+class Flames:
+    # every blast burns for its own lifetime, cells covered by several blasts are ref counted
+    def __init__(self, board: Board, lifetime: int = 30):
+        self.board = board
+        self.lifetime = lifetime
+        self.count = array("H", [0]) * board.size
+        # all blasts live equally long, so expiry order is creation order and a deque is enough
+        self.active: deque[Blast] = deque()
+
+    def ignite(self, cells: list[int], soft_blocks: list[int], now: int) -> Blast:
+        count = self.count
+        board = self.board
+        for c in cells:
+            if count[c] == 0:
+                board.set(c, FIRE)
+            count[c] += 1
+        blast = Blast(now + self.lifetime, cells, soft_blocks)
+        self.active.append(blast)
+        return blast
+
+    def expire(self, now: int) -> list[Blast]:
+        count = self.count
+        board = self.board
+        ended: list[Blast] = []
+        while self.active and self.active[0].expires <= now:
+            blast = self.active.popleft()
+            for c in blast.cells:
+                count[c] -= 1
+                if count[c] == 0:
+                    board.clear(c, FIRE)
+            ended.append(blast)
+        return ended
+
+    def clear(self) -> None:
+        count = self.count
+        for blast in self.active:
+            for c in blast.cells:
+                count[c] = 0
+        self.active.clear()
+        self.board.clear_flag(FIRE)
+
+class Detonation:
+    # everything one chain of bombs did in a single tick
+    def __init__(self):
+        self.bombs: list[tuple[int, int]] = []
+        self.cells: list[int] = [] # union of all blasts, each cell once
+        self.soft_blocks: list[int] = []
+        self.killed: list[int] = []
+        self.powerups: list[tuple[int, int]] = [] # destroyed by the blast
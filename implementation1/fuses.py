@@ -0,0 +1,51 @@
+# pyright: strict
+import heapq
+from collections.abc import Mapping
+from typing import Callable, Iterator
+
+class FuseQueue:
+    # bombs ordered by the game tick they go off, so a tick only looks at bombs that are due
+    def __init__(self):
+        self.due: dict[tuple[int, int], int] = {}
+        self.heap: list[tuple[int, int, tuple[int, int]]] = [] # (due tick, placement order, coord)
+        self.placed: int = 0
+
+    def add(self, coord: tuple[int, int], due: int) -> None:
+        self.due[coord] = due
+        heapq.heappush(self.heap, (due, self.placed, coord))
+        self.placed += 1
+
+    def remove(self, coord: tuple[int, int]) -> None:
+        # the heap entry stays and is skipped when it comes up
+        del self.due[coord]
+
+    def pop_due(self, now: int) -> list[tuple[int, int]]:
+        heap = self.heap
+        due: list[tuple[int, int]] = []
+        while heap and heap[0][0] <= now:
+            tick, _, coord = heapq.heappop(heap)
+            if self.due.get(coord) == tick: # still the same bomb
+                due.append(coord)
+        return due
+
+    def clear(self) -> None:
+        self.due.clear()
+        self.heap.clear()
+
+class FuseView(Mapping[tuple[int, int], int]):
+    # bomb -> ticks left on its fuse, what bomb_timer_per_b used to store
+    def __init__(self, fuses: FuseQueue, now: Callable[[], int]):
+        self.fuses = fuses
+        self.now = now
+
+    def __getitem__(self, coord: tuple[int, int]) -> int:
+        return self.fuses.due[coord] - self.now()
+
+    def __contains__(self, coord: object) -> bool:
+        return coord in self.fuses.due
+
+    def __iter__(self) -> Iterator[tuple[int, int]]:
+        return iter(self.fuses.due)
+
+    def __len__(self) -> int:
+        return len(self.fuses.due)
@@ -0,0 +1,154 @@
+# pyright: strict
+import argparse, contextlib, os, sys, time
+from typing import Any
+from .clock import TickClock
+from .model import Model, Bots
+from .engine import Engine
+from .settings_loader import load_settings
+from .replay import Replay, state_digest
+from .profiling import RoundProfiler
+
+# same layout as __main__, copied so this module never imports pyxel
+HEAD_Y = 17
+BLOCK_L = 10
+FPS = 30
+
+def new_model(settings: dict[str, Any]) -> Model:
+    return Model(HEAD_Y, BLOCK_L, FPS, clock=TickClock(),
+                 cols=settings.get("board_cols", 15), rows=settings.get("board_rows", 13))
+
+class RoundResult:
+    def __init__(self, match: int, round_number: int, winner: int | None, ticks: int):
+        self.match = match
+        self.round_number = round_number
+        self.winner = winner # None if draw
+        self.ticks = ticks
+
+class HeadlessRunner:
+    # plays whole matches from a logical tick counter, as fast as the cpu allows
+    def __init__(self, settings: dict[str, Any], max_ticks: int | None = None, seed: int | None = None,
+            profile_dir: str | None = None):
+        self.settings = settings
+        self.profile_dir = profile_dir # profile every round into here, merge with python -m implementation1.profiling
+        self.seed = seed # match m is played with seed + m, None for a fresh random seed each match
+        self.max_ticks = max_ticks # per match, safety net for stuck rounds
+        self.results: list[RoundResult] = []
+        self.total_ticks: int = 0
+        self.elapsed: float = 0.0
+
+    def new_engine(self, seed: int | None = None) -> Engine:
+        model = new_model(self.settings)
+        bots = Bots(model)
+        profiler = None if self.profile_dir is None else RoundProfiler(None, self.profile_dir)
+        engine = Engine(model, bots, self.settings, seed, profiler=profiler)
+        bots.unthrottle()
+        return engine
+
+    def play_match(self, match: int = 0, rounds: int | None = None) -> Engine:
+        # rounds stops early after that many rounds, for callers that want single rounds, not matches
+        engine = self.new_engine(None if self.seed is None else self.seed + match)
+        model = engine.model
+        round_start = engine.tick
+        played = 0
+        start = time.perf_counter()
+
+        while not model.overall_game_over:
+            if self.max_ticks is not None and engine.tick >= self.max_ticks:
+                break
+            if rounds is not None and played >= rounds:
+                break
+
+            was_in_transition = model.round_transition_active
+            was_counting = not model.countdown_finished
+            # nobody is watching the transition screen, skip it right away
+            engine.step(escape=was_in_transition)
+
+            if model.round_transition_active and not was_in_transition:
+                self.results.append(RoundResult(match, model.round_number, model.round_winner, engine.tick - round_start))
+                played += 1
+            elif was_counting and model.countdown_finished:
+                # rounds after the first open with the countdown, the round is timed from when it's over
+                round_start = engine.tick
+
+        self.elapsed += time.perf_counter() - start
+        self.total_ticks += engine.tick
+        return engine
+
+    def run(self, matches: int) -> list[RoundResult]:
+        for m in range(matches):
+            self.play_match(m)
+        return self.results
+
+    @property
+    def ticks_per_second(self) -> float:
+        return self.total_ticks / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def speedup(self) -> float:
+        # how many times faster than the 30 fps window
+        return self.ticks_per_second / FPS
+
+def play_replay(path: str) -> tuple[Engine, bool]:
+    # same seed, same settings, same keys and bot pacing every tick: the match plays out exactly as recorded
+    replay = Replay.load(path)
+    model = new_model(replay.settings)
+    bots = Bots(model)
+    engine = Engine(model, bots, replay.settings, replay.seed)
+    bots.unthrottle()
+    for keys, escape, planned, verdicts in replay.frames():
+        bots.follow(planned, verdicts)
+        engine.step(keys, escape)
+    return engine, state_digest(model) == replay.digest
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run bomberman matches without a window.")
+    parser.add_argument("--settings", default="settings.json")
+    parser.add_argument("--matches", type=int, default=1)
+    parser.add_argument("--bots", nargs="+", default=None, help="all-bot lineup, e.g. --bots greedy careful hostile greedy")
+    parser.add_argument("--max-ticks", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None, help="seed of the first match, the next ones count up")
+    parser.add_argument("--replay", default=None, help="play back a recorded .bmr file and check it matches")
+    parser.add_argument("--verbose", action="store_true", help="keep the game's console prints")
+    parser.add_argument("--profile", default=None, metavar="DIR", help="cProfile every round into DIR")
+    args = parser.parse_args()
+
+    if args.replay is not None:
+        start = time.perf_counter()
+        if args.verbose:
+            engine, same = play_replay(args.replay)
+        else:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                engine, same = play_replay(args.replay)
+        elapsed = time.perf_counter() - start
+        print(f"replayed {engine.tick} ticks in {elapsed:.2f}s, seed {engine.seed}")
+        print("final state matches the recording" if same else "final state DIFFERS from the recording")
+        if not same:
+            sys.exit(1)
+        return
+
+    settings = load_settings(args.settings)
+    if args.bots is not None:
+        if not (2 <= len(args.bots) <= Model.MAX_PLAYERS):
+            parser.error(f"--bots needs between 2 and {Model.MAX_PLAYERS} bot types")
+        for typ in args.bots:
+            if typ not in Bots.BOT_TYPE_INTS:
+                parser.error(f"unknown bot type '{typ}'")
+        settings["human_player_number"] = 0
+        settings["total_player_number"] = len(args.bots)
+        settings["bot_types"] = list(args.bots)
+
+    runner = HeadlessRunner(settings, args.max_ticks, args.seed, args.profile)
+    if args.verbose:
+        runner.run(args.matches)
+    else:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            runner.run(args.matches)
+
+    for r in runner.results:
+        winner = "draw" if r.winner is None else f"player {r.winner + 1}"
+        print(f"match {r.match} round {r.round_number}: {winner} after {r.ticks} ticks")
+    print(f"{runner.total_ticks} ticks in {runner.elapsed:.2f}s, "
+          f"{runner.ticks_per_second:.0f} ticks/s ({runner.speedup:.0f}x real time)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# pyright: strict
+import random
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from .board import Board, SOLID, SOFT
+
+class Layout:
+    # one finished round map: the whole flags array plus how many soft blocks it has
+    def __init__(self, flags: bytes, soft: int):
+        self.flags = flags
+        self.soft = soft
+
+class MapPool:
+    # next-round maps made ahead of time on a worker thread, so reset_round only copies one in
+    # layouts come from the pool's own rng in order, so a seed gives the same maps however fast the worker is
+    def __init__(self, board: Board, spawns: list[int], soft_percent: int, seed: int, size: int = 2, tries: int = 20):
+        self.base = bytes(board.flags) # walls, hard blocks and walkable, no soft blocks yet
+        self.steps = board.steps
+        self.spawns = spawns
+        self.soft_percent = soft_percent
+        self.size = size
+        self.tries = tries # regenerations before an unvalidated map is used anyway
+        self.rng = random.Random(seed)
+
+        # spawn cells and their neighbours stay free
+        free: set[int] = set()
+        for i in spawns:
+            free.add(i)
+            free.update(i + step for step in self.steps)
+        base = self.base
+        self.candidates = [c for c in range(board.size) if not base[c] & SOLID and c not in free]
+
+        self.pool: ThreadPoolExecutor | None = None # started on the first take
+        self.queued: deque[Future[Layout]] = deque()
+
+    def generate(self) -> Layout:
+        # runs on the worker, one at a time since the pool has a single thread
+        layout = self.roll()
+        for _ in range(self.tries):
+            if self.valid(layout.flags):
+                break
+            layout = self.roll()
+        return layout
+
+    def roll(self) -> Layout:
+        # random() is one C call a cell where randint went through three python frames, on a 101x101 board
+        # that was ~12 ms of holding the GIL while the game thread waited for its tick
+        flags = bytearray(self.base)
+        rand = self.rng.random
+        chance = self.soft_percent / 100
+        soft = 0
+        for c in self.candidates:
+            if rand() < chance:
+                flags[c] |= SOFT
+                soft += 1
+        return Layout(bytes(flags), soft)
+
+    def valid(self, flags: bytes) -> bool:
+        # every spawn can drop a bomb and walk out of its range 1 blast
+        for s in self.spawns:
+            if not self.escapable(flags, s):
+                return False
+        return True
+
+    def escapable(self, flags: bytes, start: int) -> bool:
+        blast = {start, *(start + step for step in self.steps)}
+        seen = {start}
+        todo = deque([start])
+        while todo:
+            c = todo.popleft()
+            if c not in blast:
+                return True
+            for step in self.steps:
+                n = c + step
+                if n not in seen and not flags[n] & (SOLID | SOFT):
+                    seen.add(n)
+                    todo.append(n)
+        return False
+
+    def fill(self) -> None:
+        if self.pool is None:
+            self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="map-gen")
+        while len(self.queued) < self.size:
+            self.queued.append(self.pool.submit(self.generate))
+
+    def take(self) -> Layout:
+        # normally already done, only the very first map of a match is waited for
+        self.fill()
+        layout = self.queued.popleft().result()
+        self.fill()
+        return layout
+
+    def shutdown(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+        self.queued.clear()
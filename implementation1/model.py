@@ -1,28 +1,55 @@
 # pyright: strict
-import pyxel, random
-from typing import Callable
+import random, time
+from typing import Callable, Iterable
+from .clock import TickClock
+from .pathfinding import GridPathfinder, DistanceField
+from .board import Board, CellSet, WALL, HARD, SOFT, BOMB, FIRE, DANGER, WALKABLE, SOLID
+from .danger import DangerMap, NEVER
+from .fuses import FuseQueue, FuseView
+from .flames import Flames, Detonation
+from .spatial import CellIndex
+from .planner import RolloutPlanner
+from .scheduler import BotScheduler, FULL, DEFER
+from .mapgen import MapPool, Layout
+from .telemetry import FrameTimes, NoFrameTimes
 
 class Model:
-    def __init__(self, head_y: int, block_l: int, fps: int = 30):
+    MAX_PLAYERS = 16
+    STANDARD_CELLS = 15 * 13 # boards up to this size search every reachable cell
+
+    def __init__(self, head_y: int, block_l: int, fps: int = 30, clock: TickClock | None = None,
+            cols: int = 15, rows: int = 13):
+        self.clock: TickClock = clock if clock is not None else TickClock()
+        self.rng: random.Random = random.Random() # map and powerup rolls, seeded per match
         self.block_l: int = block_l
-        self.game_x: int = 15 * block_l
-        self.game_y: int = 13 * block_l
+        self.cols: int = cols # odd, so the hard block grid ends next to a wall on every side
+        self.rows: int = rows
+        self.game_x: int = self.cols * block_l
+        self.game_y: int = self.rows * block_l
         self.y_origin: int = head_y
         self.y_end: int = self.y_origin + self.game_y
-        self.wall_coords: set[tuple[int, int]] = set()
-        self.hard_block_coords: set[tuple[int, int]] = set()
-        self.soft_block_coords: set[tuple[int, int]] = set()
+
+        # the board is the source of truth, the coord sets below are views of its flags
+        self.board: Board = Board(self.cols, self.rows, block_l, head_y)
+        self.wall_coords: CellSet = CellSet(self.board, WALL)
+        self.hard_block_coords: CellSet = CellSet(self.board, HARD)
+        self.soft_block_coords: CellSet = CellSet(self.board, SOFT)
         self._live_debug_mode: bool = False
 
         # sprites
         self.sprite_coords: dict[int, list[int]] = dict()
-        self.spawn_points = [
-            (self.block_l, self.y_origin + self.block_l), # p = 0
-            (self.game_x - self.block_l * 2, self.y_origin + self.block_l), # p = 1
-            (self.block_l, self.y_end - self.block_l * 2), # p = 2
-            (self.game_x - self.block_l * 2, self.y_end - self.block_l * 2),] # p = 3
-        
-        self._walkable_coords: set[tuple[int, int]] = set()
+        self.players: CellIndex = CellIndex(self.board) # cell of every sprite, kept in step by track()
+        self.spawn_points: list[tuple[int, int]] = self.make_spawn_points(self.MAX_PLAYERS)
+
+        # bot searches stop this many steps out on big boards, so their cost doesn't grow with the map
+        self.search_depth: int | None = None if self.board.size <= self.STANDARD_CELLS else 24
+
+        self._walkable_coords: CellSet = CellSet(self.board, WALKABLE)
+        self.maps: MapPool | None = None # next-round maps, made during the round before
+        # for the view's board layer: bumped when the whole map changes, else only the cleared cells are redrawn
+        self.map_version: int = 0
+        self.timings: FrameTimes = NoFrameTimes() # per phase frame times, only the window sets a real one
+        self.soft_cleared: list[tuple[int, int]] = []
 
         # player movement related
         self._both_keys_pressed: bool = False
@@ -30,16 +57,20 @@ class Model:
         # bomb        
         self.num_bombs_per_p: dict[int, int] = dict()
         self.bomb_owner: dict[tuple[int, int], int] = {}
-        self._all_bombs: set[tuple[int, int]] = set()
-        self.bomb_timer_per_b: dict[tuple[int, int], int] = dict()
-        self.explosions: set[tuple[int, int]] = set()       
-        self.explosion_timer: int = 0
-        self.explosion_range: set[tuple[int, int]] = set()
+        self._all_bombs: CellSet = CellSet(self.board, BOMB)
+        self.fuses: FuseQueue = FuseQueue()
+        self.bomb_timer_per_b: FuseView = FuseView(self.fuses, lambda: self.game_tick) # ticks left per bomb
+        self.BOMB_FUSE = 90 # 3 seconds since 30 fps
+        self.explosions: CellSet = CellSet(self.board, FIRE) # kept in sync by the flames
+        self.flames: Flames = Flames(self.board, lifetime=30) # 1 second per blast
+        self.explosion_range: CellSet = CellSet(self.board, DANGER) # kept in sync by the danger map
+        self.danger: DangerMap = DangerMap(self.board)
+        self.game_tick: int = 0 # advances once per update_game_state, bomb and fire times use this
 
         # for player powerups
-        self.exp_range_per_p: dict[int, int] = {0: 1, 1: 1, 2: 1, 3: 1}
-        self.max_bombs_per_p: dict[int, int] = {0: 1, 1: 1, 2: 1, 3: 1}
-        self.move_spd_per_p: dict[int, int] = {0: 1, 1: 1, 2: 1, 3: 1}
+        self.exp_range_per_p: dict[int, int] = {p: 1 for p in range(len(self.spawn_points))}
+        self.max_bombs_per_p: dict[int, int] = {p: 1 for p in range(len(self.spawn_points))}
+        self.move_spd_per_p: dict[int, int] = {p: 1 for p in range(len(self.spawn_points))}
 
         # powerups
         self.powerups: dict[tuple[int, int], str] = {}
@@ -52,7 +83,7 @@ class Model:
             }
         
         # for game over tracking
-        self.start_frame: int = pyxel.frame_count  
+        self.start_frame: int = self.clock.frame_count  
         self.timer_seconds: int
         self.game_over: bool = False 
         self.game_over_time: int = 30
@@ -91,20 +122,19 @@ class Model:
         self.countdown_time -= 1
         if self.countdown_time == 0:
             self.countdown_finished = True
-            self.start_frame = pyxel.frame_count
+            self.start_frame = self.clock.frame_count
         return
 
     def reset_round(self, soft_block_percent: int, powerup_percent: int, timer_seconds: int):
         # clear
         self.sprite_coords.clear()
-        self.soft_block_coords.clear()
+        self.players.clear()
         self.powerups.clear()
         self.new_power_up_coords.clear()
-        self._all_bombs.clear()
-        self.bomb_timer_per_b.clear()
+        self.fuses.clear()
         self.bomb_owner.clear()
-        self.explosions.clear()
-        self.explosion_range.clear()
+        self.flames.clear()
+        self.danger.reset()
 
         # reset player stats
         for p in range(len(self.round_wins)):
@@ -115,7 +145,13 @@ class Model:
 
         # regenerate map & sprites
         self.generate_sprites(len(self.round_wins))
-        self.generate_soft_blocks(soft_block_percent)
+        if self.maps is not None:
+            self.use_layout(self.maps.take())
+        else:
+            self.soft_block_coords.clear()
+            self._all_bombs.clear()
+            self.generate_soft_blocks(soft_block_percent)
+        self.map_changed()
         self.powerup_percent = powerup_percent
 
         # timers, recheck
@@ -128,7 +164,7 @@ class Model:
         # when is round over
         if self.round_end_frame is None:
             # start round end
-            self.round_end_frame = pyxel.frame_count
+            self.round_end_frame = self.clock.frame_count
 
             if self.game_over_text != "draw":
                 self.round_winner = int(self.game_over_text) - 1
@@ -145,7 +181,7 @@ class Model:
                     self.overall_game_over = True
                     self.round_results_text = f"Game over! Player {p + 1} wins!"
                     
-        elif pyxel.frame_count - self.round_end_frame >= self.ROUND_DELAY:
+        elif self.clock.frame_count - self.round_end_frame >= self.ROUND_DELAY:
             # check if match over
             if self.round_winner is not None and self.round_wins[self.round_winner] >= self.rounds_to_win:
                 self.overall_game_over = True
@@ -157,7 +193,7 @@ class Model:
                 self.round_winner = None
                 if not self.overall_game_over:
                     self.reset_round(soft_block_percent, powerup_percent, timer_seconds)
-                    self.round_start_frame = pyxel.frame_count
+                    self.round_start_frame = self.clock.frame_count
 
 
     # function lang na pangprint, can be removed, for checking
@@ -170,17 +206,36 @@ class Model:
 
     """generation functions"""
 
+    def make_spawn_points(self, n: int) -> list[tuple[int, int]]:
+        # the four corners first (p = 0 to 3 like before), then each next spawn is the
+        # odd/odd cell farthest from every spawn so far, those cells never have a hard block next to them
+        cols, rows = self.cols, self.rows
+        cells = [(1, 1), (cols - 2, 1), (1, rows - 2), (cols - 2, rows - 2)]
+        candidates = [(cx, cy) for cy in range(1, rows - 1, 2) for cx in range(1, cols - 1, 2)]
+        n = min(n, len(candidates))
+        nearest = [min(abs(cx - sx) + abs(cy - sy) for sx, sy in cells) for cx, cy in candidates]
+        while len(cells) < n:
+            k = max(range(len(candidates)), key=nearest.__getitem__)
+            sx, sy = candidates[k]
+            cells.append((sx, sy))
+            for j, (cx, cy) in enumerate(candidates):
+                d = abs(cx - sx) + abs(cy - sy)
+                if d < nearest[j]:
+                    nearest[j] = d
+        bl = self.block_l
+        return [(cx * bl, self.y_origin + cy * bl) for cx, cy in cells[:n]]
+
     def generate_walls(self):
         for i in range(0, self.game_x, self.block_l):
             for j in range(self.y_origin, self.y_end, self.block_l):
                 if (i == 0 or j == self.y_origin or i == self.game_x - self.block_l 
                 or j == self.y_end - self.block_l):
-                    self.wall_coords.add((i, j))
+                    self.board.set(self.board.index((i, j)), WALL)
 
     def generate_hard_blocks(self):
         for i in range(self.block_l * 2, self.game_x - self.block_l, self.block_l * 2):
             for j in range(self.y_origin + self.block_l * 2, self.y_end - self.block_l, self.block_l * 2):
-                self.hard_block_coords.add((i, j))
+                self.board.set(self.board.index((i, j)), HARD)
 
     def generate_sprites(self, player_number: int):
         self.player_number: int = player_number
@@ -188,26 +243,62 @@ class Model:
 
         for p in range(player_number):
             self.sprite_coords[p] = list(self.spawn_points[p])
+            self.track(p)
             self.num_bombs_per_p[p] = 0
 
     def generate_soft_blocks(self, spawn_percent: int): # should generate everywhere sa board except player spawn points, tabi ng spawn points, and hard blocks
+        board = self.board
+        # spawn cells and their neighbours stay free
+        free: set[int] = set()
+        for x, y in self.sprite_coords.values():
+            i = board.index((x, y))
+            if i >= 0:
+                free.add(i)
+                free.update(i + step for step in board.steps)
+
         for i in range(self.block_l, self.game_x - self.block_l, self.block_l):
             for j in range(self.y_origin + self.block_l, self.y_end - self.block_l, self.block_l):
-                if not ((i, j) in self.hard_block_coords
-                or [i, j] in self.sprite_coords.values()
-                or [i + self.block_l, j] in self.sprite_coords.values()
-                or [i, j + self.block_l] in self.sprite_coords.values()
-                or [i - self.block_l, j] in self.sprite_coords.values()
-                or [i, j - self.block_l] in self.sprite_coords.values()):
-                    
-                    if random.randint(0, 99) < spawn_percent:
-                        self.soft_block_coords.add((i, j))
+                c = board.index((i, j))
+                if not (board.flags[c] & HARD or c in free):
+                    if self.rng.randint(0, 99) < spawn_percent:
+                        board.set(c, SOFT)
+
+    def start_maps(self, spawn_percent: int) -> None:
+        # after the walls, hard blocks and sprites are in, lays out the first round
+        # every round after takes its soft blocks from the pool too
+        spawns = [self.board.index((x, y)) for x, y in self.sprite_coords.values()]
+        if self.maps is not None:
+            self.maps.shutdown()
+        self.maps = MapPool(self.board, spawns, spawn_percent, self.rng.getrandbits(64))
+        self.use_layout(self.maps.take())
+
+    def use_layout(self, layout: Layout) -> None:
+        # one copy of the whole board, bombs and fire are already cleared by the caller
+        board = self.board
+        board.flags[:] = layout.flags
+        board.counts[SOFT] = layout.soft
+        board.counts[BOMB] = 0
+        board.counts[FIRE] = 0
+        board.counts[DANGER] = 0
+        board.version += 1
+
+    def map_changed(self) -> None:
+        self.map_version += 1
+        self.soft_cleared.clear()
+
+    def take_soft_cleared(self) -> list[tuple[int, int]]:
+        # soft blocks destroyed since the last call
+        cleared = self.soft_cleared
+        self.soft_cleared = []
+        return cleared
 
     def generate_walkable_coords(self):
         for i in range(self.block_l, self.game_x - self.block_l, self.block_l):
             for j in range(self.y_origin + self.block_l, self.y_end - self.block_l, self.block_l):
-                if not (i, j) in self.hard_block_coords:
-                    self._walkable_coords.add((i, j)) # para may set lang ng lahat ng coords na pede lakaran
+                c = self.board.index((i, j))
+                if not self.board.flags[c] & HARD:
+                    self.board.set(c, WALKABLE) # para may set lang ng lahat ng coords na pede lakaran
+        self.board.build_reach() # walls and hard blocks are done, not in the first bomb's tick
 
 
     """snap funtions"""
@@ -245,6 +336,7 @@ class Model:
             if not self.will_not_collide(p, "up"):
                 break
             self.sprite_coords[p][1] -= 1
+        self.track(p)
 
     def move_down(self, p: int):
         y = self.sprite_coords[p][1]
@@ -254,6 +346,7 @@ class Model:
             if not self.will_not_collide(p, "down"):
                 break
             self.sprite_coords[p][1] += 1
+        self.track(p)
         
     def move_left(self, p: int):
         x = self.sprite_coords[p][0]
@@ -263,6 +356,7 @@ class Model:
             if not self.will_not_collide(p, "left"):
                 break
             self.sprite_coords[p][0] -= 1
+        self.track(p)
 
     def move_right(self, p: int):
         x = self.sprite_coords[p][0]
@@ -272,43 +366,46 @@ class Model:
             if not self.will_not_collide(p, "right"):
                 break
             self.sprite_coords[p][0] += 1
+        self.track(p)
+
+    def track(self, p: int) -> None:
+        # call after sprite_coords[p] changes, cheap when the player is still in the same cell
+        x, y = self.sprite_coords[p]
+        self.players.move(p, self.board.index((self.snap_x(x), self.snap_y(y))))
+
+    def remove_player(self, p: int) -> None:
+        del self.sprite_coords[p]
+        self.players.remove(p)
 
     """player collision function"""
 
     def will_not_collide(self, p: int, direction: str):
         x, y = self.sprite_coords[p]
+        board = self.board
 
         if direction == "up":
-            target = (x, y - self.block_l)
             return (
                 y - self.block_l > self.y_origin # di tatama sa wall
                 and x in range(self.block_l, self.game_x - self.block_l, self.block_l * 2) # di tatama sa hard blocks
-                and target not in self.soft_block_coords # di tatama sa soft blocks
-                and target not in self.bomb_timer_per_b.keys())  # bomb check
+                and not board.has(board.index((x, y - self.block_l)), SOFT | BOMB)) # soft block and bomb check
 
         if direction == "down":
-            target = (x, y + self.block_l)
             return (
                 y + self.block_l < self.y_end - self.block_l
                 and x in range(self.block_l, self.game_x - self.block_l, self.block_l * 2)
-                and target not in self.soft_block_coords
-                and target not in self.bomb_timer_per_b.keys())
+                and not board.has(board.index((x, y + self.block_l)), SOFT | BOMB))
 
         if direction == "left":
-            target = (x - self.block_l, y)
             return (
                 x - self.block_l > 0
                 and y in range(self.y_origin + self.block_l, self.y_end - self.block_l, self.block_l * 2)
-                and target not in self.soft_block_coords
-                and target not in self.bomb_timer_per_b.keys())
+                and not board.has(board.index((x - self.block_l, y)), SOFT | BOMB))
 
         if direction == "right":
-            target = (x + self.block_l, y)
             return (
                 x + self.block_l < self.game_x - self.block_l
                 and y in range(self.y_origin + self.block_l, self.y_end - self.block_l, self.block_l * 2)
-                and target not in self.soft_block_coords
-                and target not in self.bomb_timer_per_b.keys())
+                and not board.has(board.index((x + self.block_l, y)), SOFT | BOMB))
 
     """bomb functions"""
 
@@ -325,20 +422,16 @@ class Model:
 
         # place bomb
         self._all_bombs.add((px, py))
-        self.bomb_timer_per_b[(px, py)] = 90
+        self.fuses.add((px, py), self.game_tick + self.BOMB_FUSE)
         self.bomb_owner[(px, py)] = p
         self.num_bombs_per_p[p] += 1
         self.get_future_explosion_range((px, py))
 
     def update_bomb(self) -> None:
-        exploded: list[tuple[int, int]] = []
-
-        for coord, timer in self.bomb_timer_per_b.items():
-            if timer <= 0:
-                exploded.append(coord)
-
-        for coord in exploded:
-            self.explode(coord)
+        # only bombs whose fuse ran out this tick come off the queue
+        due = self.fuses.pop_due(self.game_tick)
+        if due:
+            self.apply_detonation(self.resolve_detonations(due))
 
     """explosion functions"""
 
@@ -346,143 +439,154 @@ class Model:
         if coords not in self.bomb_owner:
             return 
 
-        x, y = coords
         p = self.bomb_owner[coords]
-
-        # center always explodes
-        self.explosion_range.add((x, y))
-
-        directions = [
-            ( self.block_l, 0),
-            (-self.block_l, 0),
-            (0,  self.block_l),
-            (0, -self.block_l),
-        ]
-
-        for dx, dy in directions:
-            for i in range(1, self.exp_range_per_p[p] + 1):
-                pos = (x + dx * i, y + dy * i)
-
-                # stop at wall or hard block
-                if pos in self.wall_coords or pos in self.hard_block_coords:
-                    break
-
-                self.explosion_range.add(pos)
-
-                # stop after soft block
-                if pos in self.soft_block_coords:
-                    break
+        tick = self.fuses.due[coords]
+        self.danger.add_bomb(self.board.index(coords), tick, self.exp_range_per_p[p])
             
     def explode(self, coords: tuple[int, int]) -> None:
         if coords not in self._all_bombs:
             return
-
-        x, y = coords
-
-        # hiniwalay for ocp
-        p = self.remove_bomb(coords)
-
-        self.explosion_range.discard(coords) # wala na sa range dahil nag explode na
-        self.explosions.add((x, y))  # center always explodes
-
-        # directions: right, left, down, up
-        directions = [
-            ( self.block_l, 0),
-            (-self.block_l, 0),
-            (0,  self.block_l),
-            (0, -self.block_l),
-        ]
-
-        for dx, dy in directions:
-            for i in range(1, self.exp_range_per_p[p] + 1):
-                pos = (x + dx * i, y + dy * i)
-
-                # stop at hard block or wall
-                if self.hit_hard_or_wall(pos):
-                    break
-
-                # explode this tile
-                self.explosion_range.discard(pos)
-                self.explosions.add(pos)
-
-                # stop after soft block
-                if self.hit_soft_block(pos):
-                    break
-
-        self.explosion_timer = pyxel.frame_count
+        self.apply_detonation(self.resolve_detonations([coords]))
+
+    def resolve_detonations(self, due: list[tuple[int, int]]) -> Detonation:
+        # the whole chain in one worklist pass, bombs hit by a blast go off in the same tick
+        board = self.board
+        flags = board.flags
+        ray = board.ray
+        result = Detonation()
+        hit: set[int] = set()
+
+        work = [board.index(coords) for coords in due if coords in self._all_bombs]
+        queued = set(work)
+        k = 0
+        while k < len(work):
+            c = work[k]
+            k += 1
+            coords = board.coord(c)
+
+            # hiniwalay for ocp
+            p = self.remove_bomb(coords)
+            self.danger.remove_bomb(c) # wala na sa range dahil nag explode na
+            result.bombs.append(coords)
+
+            # center always explodes
+            if c not in hit:
+                hit.add(c)
+                result.cells.append(c)
+
+            # directions: right, left, down, up, each ray already stops before a hard block or wall
+            rng = self.exp_range_per_p[p]
+            for d in range(4):
+                for pos in ray(c, d, rng):
+                    # explode this tile
+                    if pos not in hit:
+                        hit.add(pos)
+                        result.cells.append(pos)
+
+                    # another bomb, goes off in this same pass
+                    if flags[pos] & BOMB and pos not in queued:
+                        queued.add(pos)
+                        work.append(pos)
+
+                    # stop after soft block
+                    if self.destroy_soft_block(pos):
+                        result.soft_blocks.append(pos)
+                        break
+
+        for c, ps in self.players.at.items():
+            if c in hit:
+                result.killed += ps
+
+        for coords in self.powerups:
+            if board.index(coords) in hit:
+                result.powerups.append(coords)
+
+        return result
+
+    def apply_detonation(self, result: Detonation) -> None:
+        if not result.bombs:
+            return
+        self.flames.ignite(result.cells, result.soft_blocks, self.game_tick)
+        for q in result.killed:
+            self.remove_player(q)
+        for coords in result.powerups:
+            del self.powerups[coords]
 
     def remove_bomb(self, coords: tuple[int, int]) -> int:
-        del self.bomb_timer_per_b[coords]
+        self.fuses.remove(coords)
         p = self.bomb_owner.pop(coords)
         self.num_bombs_per_p[p] -= 1
         self._all_bombs.discard(coords)
         return p
     
-    def hit_hard_or_wall(self, coords: tuple[int, int]) -> bool:
-        return coords in self.hard_block_coords or coords in self.wall_coords
-    
-    def hit_soft_block(self, coords: tuple[int, int]) -> bool:
-        if coords in self.soft_block_coords:
-            self.new_power_up_coords.add(coords)
-            self.soft_block_coords.remove(coords)
+    def destroy_soft_block(self, i: int) -> bool:
+        if self.board.clear(i, SOFT):
+            coord = self.board.coord(i)
+            self.new_power_up_coords.add(coord)
+            self.soft_cleared.append(coord)
+            self.danger.dirty = True # rays through this cell are longer now
             return True
         else:
             return False
 
     def players_caught_in_explosion(self) -> None:
+        flags = self.board.flags
         dead_players: list[int] = []
-        for p, (x, y) in self.sprite_coords.items():
-
-            # nagdagdag ng snap para kahit touching lang sa explosion mamamatay pa rin
-            px = self.snap_x(x)
-            py = self.snap_y(y)
-            
-            if (px, py) in self.explosions:
-                dead_players.append(p)
+        # the index is by snapped cell, kaya kahit touching lang sa explosion mamamatay pa rin
+        for c, ps in self.players.at.items():
+            if flags[c] & FIRE:
+                dead_players += ps
 
         for p in dead_players:
             # print(f"Player {p + 1} ded!")
-            del self.sprite_coords[p]  # or mark as dead
+            self.remove_player(p)  # or mark as dead
 
     def update_explosions(self) -> None:
-        if not self.explosions:
+        if not self.flames.active:
             return
 
         # hiniwalay ko lang function pero same lang
         self.players_caught_in_explosion()
 
-        # if another bomb in explosion
-        for coord in list(self._all_bombs):
-            if coord in self.explosions:
-                self.explode(coord)
+        # a bomb placed into flames that are still burning
+        board = self.board
+        burning = [board.coord(i) for i in board.cells(BOMB) if board.flags[i] & FIRE]
+        if burning:
+            self.apply_detonation(self.resolve_detonations(burning))
 
-        # may condition pa dapat dito para aalisin powerup if kasama sa explosion
-        for coord in list(self.powerups):
-            if coord in self.explosions:
-                self.powerups.pop(coord)
-
-        # remove explosions after 1 second 
-        if pyxel.frame_count - self.explosion_timer >= 30:
-            self.explosions.clear()
-
-            # spawn lang ng powerups if nagclear na explosions
-            self.spawn_powerups()
+        # each blast goes out 1 second after its own bomb, not after the latest one
+        for blast in self.flames.expire(self.game_tick):
+            # spawn lang ng powerups sa soft blocks na sinira ng blast na to
+            self.spawn_powerups([board.coord(i) for i in blast.soft_blocks])
 
     """powerup functions"""
     
-    def spawn_powerups(self) -> None:
-        for pos in self.new_power_up_coords:
-            if random.randint(0, 99) < self.powerup_percent:
+    def spawn_powerups(self, coords: Iterable[tuple[int, int]] | None = None) -> None:
+        # default is every destroyed soft block still waiting for its powerup roll
+        if coords is None:
+            coords = list(self.new_power_up_coords)
+        for pos in coords:
+            if pos not in self.new_power_up_coords:
+                continue
+            self.new_power_up_coords.discard(pos)
+            if self.rng.randint(0, 99) < self.powerup_percent:
+                # lands in another blast that is still burning, destroyed right away
+                if self.board.has(self.board.index(pos), FIRE):
+                    continue
                 # snap
                 gx = self.snap_x(pos[0])
                 gy = self.snap_y(pos[1])
-                kind = random.choice(list(self._powerup_effects.keys()))
+                kind = self.rng.choice(list(self._powerup_effects.keys()))
                 self.powerups[(gx, gy)] = kind
                 # print("powerup coords:", (gx, gy), "powerup:", kind)
-        self.new_power_up_coords = set() # nagspawn na lahat so clear the set
     
     def _powerup_fire(self, p: int) -> None:
         self.exp_range_per_p[p] += 1
+        # bombs already placed use the new range when they go off
+        for coord, owner in self.bomb_owner.items():
+            if owner == p:
+                self.danger.set_range(self.board.index(coord), self.exp_range_per_p[p])
+        self.danger.refresh()
 
     def _powerup_bomb(self, p: int) -> None:
         self.max_bombs_per_p[p] += 1
@@ -491,29 +595,37 @@ class Model:
         self.move_spd_per_p[p] += 1
 
     def pickup_powerups(self) -> None:
-        for p, (x, y) in list(self.sprite_coords.items()):
-            gx = self.snap_x(x)
-            gy = self.snap_y(y)
-
-            pos = (gx, gy)
+        if not self.powerups:
+            return
+        for c, ps in list(self.players.at.items()):
+            pos = self.board.coord(c)
             if pos not in self.powerups:
                 continue
 
+            # two players on one powerup, the lower number got there first like before
             kind = self.powerups.pop(pos)
             effect = self._powerup_effects[kind]
-            effect(p)
+            effect(min(ps))
 
     """timer functions"""
 
     def bomb_timer(self) -> None:
-        for coord in list(self.bomb_timer_per_b):
-            self.bomb_timer_per_b[coord] -= 1
+        # fuses are stored as absolute ticks, so moving time forward is all it takes
+        self.game_tick += 1
+
+    def ticks_until_fire(self, coord: tuple[int, int]) -> int:
+        # 0 if burning now, NEVER if no bomb reaches it
+        i = self.board.index(coord)
+        if self.board.has(i, FIRE):
+            return 0
+        t = self.danger.at(i)
+        return t if t == NEVER else max(t - self.game_tick, 0)
 
     def start_game_timer(self, time: int) -> None:
         self.timer_seconds = time
 
     def remaining_time(self) -> int:
-        elapsed_seconds: int = int((int(pyxel.frame_count) - self.start_frame) // 30)
+        elapsed_seconds: int = int((self.clock.frame_count - self.start_frame) // 30)
         return max(self.timer_seconds - elapsed_seconds, 0)
     
     def start_game_over_timer(self) -> None:
@@ -537,11 +649,19 @@ class Model:
             self.game_over_text = str(p)
 
     def update_game_state(self) -> None:
+        t = self.timings
+        t.mark()
         self.update_explosions()
+        t.lap("explosions")
         self.update_bomb()
         self.bomb_timer()
+        t.lap("bombs")
         self.pickup_powerups()
+        t.lap("pickups")
+        self.danger.refresh()
+        t.lap("danger")
         self.check_game_over()
+        t.lap("game over")
 
     def toggle_live_debug_mode(self) -> None:
          self._live_debug_mode = True if self._live_debug_mode == False else False
@@ -551,12 +671,16 @@ class Model:
         return self._live_debug_mode
 
     @property
-    def walkable_coords(self) -> set[tuple[int, int]]:
+    def walkable_coords(self) -> CellSet:
         return self._walkable_coords
     
     @property
-    def all_bombs(self) -> set[tuple[int, int]]:
+    def all_bombs(self) -> CellSet:
         return self._all_bombs
+
+    @property
+    def board_version(self) -> int:
+        return self.board.version
         
 """"PHASE 3"""
 
@@ -566,14 +690,16 @@ class Bots:
         "hostile": (0.5, 25),
         "careful": (0.25, 100),
         "greedy": (1.0, 100),
+        "planner": (1.0, 100), # not used for reevaluate, the planner decides on its own
         }
     
     BOT_TYPE_DANGER: dict[str, int] = {
         "hostile": 0,
         "careful": 4,
-        "greedy": 2
+        "greedy": 2,
+        "planner": 2,
         }
-    
+
     def __init__(self, model: Model):
         self.model = model
         self.bot_players: dict[int, str] = {}
@@ -588,87 +714,77 @@ class Bots:
         self.bot_int_vals: dict[int, tuple[float, int]] = {}
         self.bot_states: dict[int, str] = {}
         self.bot_danger_rads: dict[int, int] = {}
+        self.pathfinder = GridPathfinder(model.board)
+        self.fields: dict[int, DistanceField] = {}
+        self.rng: random.Random = random.Random() # own stream so bot decisions don't shift the map rolls
+        self.planner: RolloutPlanner | None = None # only made if a planner bot is playing
+        self.scheduler: BotScheduler = BotScheduler()
+        self.timings: FrameTimes = NoFrameTimes() # per bot frame times, shared with the model's
+        self.paced: bool = False # the window calls begin_frame once per drawn frame, else every tick is a frame
+        self.thought_at: int = -1 # tick of the last update_bots, pacing is only news on that tick
 
     def set_bots(self, total_players: int, human_players: int, bot_types: list[str]) -> None:
         i = 0
         for p in range(human_players, total_players):
             self.bot_players[p] = bot_types[i]
             self.escaping_bots[p] = 0
+            # search buffers are board sized, made with the match instead of in its first tick
+            self.fields[p] = DistanceField(self.pathfinder)
             i += 1
+        if "planner" in self.bot_players.values():
+            self.planner = RolloutPlanner(self.model)
         self.set_bot_type_int()
 
     def set_bot_type_int(self) -> None:
         for p, bot_type in self.bot_players.items():
             self.bot_int_vals[p] = self.BOT_TYPE_INTS[bot_type]
             self.bot_danger_rads[p] = self.BOT_TYPE_DANGER[bot_type]
+        self.scheduler.assign({p: round(30 * interval) for p, (interval, _) in self.bot_int_vals.items()})
 
-    def make_bot_path(self, p: int, end: tuple[int, int]) -> list[tuple[int, int]]:
-        dist: dict[tuple[int, int], int] = {}
-        prev: dict[tuple[int, int], tuple[int, int] | None] = {}
+    def unthrottle(self) -> None:
+        # no wall clock limits, so every run of a seed plays the same, a replay gets the recorded ones from follow
+        self.scheduler.limit = False
+        if self.planner is not None:
+            self.planner.max_ms = None
+
+    def distance_field(self, p: int) -> DistanceField:
+        # one search per bot, shared by wander, escape, powerup and attack until the bot changes cell
+        # or any board flag changes (every set and clear bumps the version), a flood only reads those
         _sprite_coord = self.model.sprite_coords[p]
         x, y = self.model.snap_x(_sprite_coord[0]), self.model.snap_y(_sprite_coord[1])
         start = (x, y)
 
-        coords = self.model.walkable_coords.copy()
-        coords.difference_update(self.model.explosions)
-
-        bomb_locs = self.model.all_bombs
-        if start not in bomb_locs:
-            coords.difference_update(bomb_locs)
-
-        if self.escaping_bots[p] == 1:
-            coords.difference_update(self.model.soft_block_coords)
-
-        if start not in coords or end not in coords:
-            return []
-
-        for node in coords:
-            dist[node] = 10**9
-            prev[node] = None
+        if p not in self.fields:
+            self.fields[p] = DistanceField(self.pathfinder)
+        field = self.fields[p]
 
-        dist[start] = 0
-        unvisited = coords
+        key = (self.model.board_version, x, y, self.escaping_bots[p])
+        if field.key == key:
+            return field
 
-        step = self.model.block_l
+        self.pathfinder.flood(start, field, self.blocked_mask(p, start), self.model.search_depth)
+        field.key = key
+        return field
 
-        while unvisited:
-            current = min(unvisited, key=lambda n: dist[n])
-            unvisited.remove(current)
-
-            if current == end:
-                break
-
-            cx, cy = current
-
-            neighbors = [
-                (cx + step, cy),
-                (cx - step, cy),
-                (cx, cy + step),
-                (cx, cy - step),
-            ]
-
-            for nx, ny in neighbors:
-                if (nx, ny) not in unvisited:
-                    continue
+    def blocked_mask(self, p: int, start: tuple[int, int]) -> int:
+        blocked = FIRE
+        if start not in self.model.all_bombs:
+            blocked |= BOMB
 
-                alt = dist[current] + 1
-                if alt < dist[(nx, ny)]:
-                    dist[(nx, ny)] = alt
-                    prev[(nx, ny)] = current
+        if self.escaping_bots[p] == 1:
+            blocked |= SOFT
+        return blocked
 
-        # reconstruct path
-        path: list[tuple[int, int]] = []
-        node = end
-        while node is not None:
-            path.append(node)
-            node = prev[node]
+    def make_bot_path(self, p: int, end: tuple[int, int]) -> list[tuple[int, int]]:
+        return self.distance_field(p).path_to(end)
 
-        path.reverse()
+    def safe_goals(self, p: int) -> list[int]:
+        # reachable cells that are not soft blocks and not about to / currently on fire
+        # board cells, not coords, the caller only turns the one it picks into a coord
+        field = self.distance_field(p)
+        flags = self.model.board.flags
+        return [c for c in field.order[:field.count] if not flags[c] & (SOFT | DANGER | FIRE)]
 
-        if path and path[0] == start:
-            return path
-        return []
-    
     def move_bot_to(self, p: int, coord: tuple[int, int]) -> None:
         x, y = self.model.sprite_coords[p]
         nx, ny = coord
@@ -678,6 +794,7 @@ class Bots:
         # snap
         if abs(x - nx) <= speed and abs(y - ny) <= speed:
             self.model.sprite_coords[p] = [nx, ny]
+            self.model.track(p)
             if self.bot_paths[p]:
                 self.bot_paths[p].pop(0)
             return
@@ -698,61 +815,27 @@ class Bots:
                 self.model.move_down(p)
 
     def wander(self, p: int):
-        possible_goals = (
-            self.model.walkable_coords.copy()
-            - self.model.soft_block_coords
-            - self.model.explosion_range
-            - self.model.explosions
-        )
-
-        list_possible_goals = list(possible_goals)
-        random.shuffle(list_possible_goals)
-
-        for goal in list_possible_goals:
-            new_bot_path = self.make_bot_path(p, goal)
-            if not new_bot_path:
-                continue
-            else:
-                self.bot_goal[p] = goal
-                self.bot_paths[p] = new_bot_path
-                self.bot_states[p] = "wander"
-                return           
+        goals = self.safe_goals(p)
+        if not goals:
+            return
+
+        goal = self.model.board.coord(self.rng.choice(goals))
+        self.bot_goal[p] = goal
+        self.bot_paths[p] = self.make_bot_path(p, goal)
+        self.bot_states[p] = "wander"
 
     def escape(self, p: int):
         self.escaping_bots[p] = 1
-        # coord = self.model.sprite_coords[p]
-        # x, y = self.model.snap_x(coord[0]), self.model.snap_y(coord[1])
-        goals: list[tuple[int, int]] = []
-
-        possible_goals = (
-            self.model.walkable_coords.copy()
-            - self.model.soft_block_coords
-            - self.model.explosion_range
-            - self.model.explosions
-        )
-
-        if not possible_goals:
+        goals = self.safe_goals(p)
+        if not goals:
             self.wander(p)
             return
 
-        for pos in possible_goals:
-        #     if (x - self.model.block_l * 8 <= pos[0] <= x + self.model.block_l * 8 
-        #     and y - self.model.block_l * 8 <= pos[1] <= y + self.model.block_l * 8):
-        #         goals.append(pos)
-            goals.append(pos)
-
-        random.shuffle(goals)
-
-        for goal in goals:
-            new_bot_path = self.make_bot_path(p, goal)
-            if new_bot_path:
-                print(f"{p} escape! {goal}")
-                self.bot_goal[p] = goal
-                self.bot_paths[p] = new_bot_path
-                self.bot_states[p] = "escape"
-                return
-
-        self.wander(p)
+        goal = self.model.board.coord(self.rng.choice(goals))
+        print(f"{p} escape! {goal}")
+        self.bot_goal[p] = goal
+        self.bot_paths[p] = self.make_bot_path(p, goal)
+        self.bot_states[p] = "escape"
 
     def get_powerup(self, p: int) -> None:
         # no powerup, wander state
@@ -783,41 +866,40 @@ class Bots:
         # bomb placement range R per bot type
         R = 2 if bot_type == "hostile" else 4 if bot_type == "careful" else 3
 
-        for q, (qx, qy) in self.model.sprite_coords.items():
-            if q == p:
-                continue
-
-            dist = abs(x - self.model.snap_x(qx)) + abs(y - self.model.snap_y(qy))
-            if dist <= R * self.model.block_l:
-                self.model.place_bomb(p)
-                if (x, y) in self.model.all_bombs:
-                    print(f"{p} attack: bomb placed")
-                    self.escape(p)
-                return
+        players = self.model.players
+        if any(q != p for q in players.within(players.cell_of[p], R)):
+            self.model.place_bomb(p)
+            if (x, y) in self.model.all_bombs:
+                print(f"{p} attack: bomb placed")
+                self.escape(p)
 
     def in_danger(self, coord: tuple[int, int], p: int | None = None):
         px, py = self.model.snap_x(coord[0]), self.model.snap_y(coord[1])
+        board = self.model.board
+        here = board.index((px, py))
 
         if p is not None:
             bot_type = self.bot_players[p]
 
             if bot_type == "hostile":
-                return (px, py) in self.model.all_bombs and (px, py) not in self.model.explosions
+                return board.has(here, BOMB) and not board.has(here, FIRE)
             
             # if not hostile
-            coord_lis: list[tuple[int, int]] = []
+            coord_lis: list[int] = []
             for i in range(px - self.model.block_l * self.BOT_TYPE_DANGER[bot_type], px + self.model.block_l * self.BOT_TYPE_DANGER[bot_type] + 1, self.model.block_l):
                 for j in range(py - self.model.block_l * self.BOT_TYPE_DANGER[bot_type], py + self.model.block_l * self.BOT_TYPE_DANGER[bot_type] + 1, self.model.block_l):
-                    if (i, j) in self.model.walkable_coords:
-                        coord_lis.append((i, j))
+                    c = board.index((i, j))
+                    if board.has(c, WALKABLE):
+                        coord_lis.append(c)
             
-            for coord in coord_lis:
-                if coord in self.model.explosion_range or (px, py) in self.model.explosions:
+            for c in coord_lis:
+                if board.has(c, DANGER) or board.has(here, FIRE):
                     print(f"{p} danger worked")
                     return True
                 return False
 
-        return (px, py) in self.model.explosion_range or (px, py) in self.model.explosions
+        # danger map is kept current, so this is one flag check
+        return board.has(here, DANGER | FIRE)
     
     def danger_score(self, pos: tuple[int, int]) -> int:
         score = 0
@@ -835,8 +917,18 @@ class Bots:
                     self.escape(p)
     
     def check_explosion_next_block(self, p: int, next_coord: tuple[int, int]):
+        # an escaping bot walks through cells that will burn, so for it also a bomb going off there while it is
+        # in that cell, from rounding into it until rounding out of it; fire landing before that is already
+        # burning when the bot gets close. other bots re-plan through reevaluate, rerouting them around every
+        # timed cell too kept them from closing in and nearly doubled the full timer draws
+        x, y = self.model.sprite_coords[p]
+        speed = self.model.move_spd_per_p[p]
+        half = self.model.block_l // 2
+        dist = abs(next_coord[0] - x) + abs(next_coord[1] - y)
         if (next_coord in self.model.explosions 
-            or next_coord in self.model.all_bombs):
+            or next_coord in self.model.all_bombs
+            or (self.escaping_bots[p] == 1
+                and max(dist - half, 0) // speed <= self.model.ticks_until_fire(next_coord) <= (dist + half) // speed)):
             if self.escaping_bots[p] == 1:
                 self.escape(p)
             elif self.bot_states[p] == "get_powerup":
@@ -855,145 +947,204 @@ class Bots:
         coord = self.model.sprite_coords[p]
         start = (self.model.snap_x(coord[0]), self.model.snap_y(coord[1]))
 
-        powerup_cells = list(self.model.powerups.keys())
-
         # hostile bots only 20% chance, fails 80%
-        if bot_type == "hostile" and random.randint(0, 99) >= 20:
+        if bot_type == "hostile" and self.rng.randint(0, 99) >= 20:
             return False
 
-        # policy 1: closest powerup (greedy)
+        field = self.distance_field(p)
+        reachable = [c for c in self.model.powerups if field.reaches(c)]
+
+        # policy 1: closest powerup by walking distance (greedy)
         if bot_type == "greedy":
-            powerup_cells.sort(
-                key=lambda c: abs(c[0] - start[0]) + abs(c[1] - start[1]) #erm manhattan computation not sure if tama
-            )
-
-            for cell in powerup_cells:
-                path = self.make_bot_path(p, cell)
-                
-                if path:
-                    self.bot_goal[p] = cell
-                    self.bot_paths[p] = path
-                    pu = self.model.powerups[cell]
-                    print(f"{p} powerup: {pu} at {cell}")
-                    return True
+            candidates = reachable
+            if not candidates:
+                return False
+            cell = min(candidates, key=field.distance)
 
         # policy 2: reachable powerup within 4 cells (hostile/careful)
         else:
-            nearby = [
-                c for c in powerup_cells
+            candidates = [
+                c for c in reachable
                 if abs(c[0] - start[0]) + abs(c[1] - start[1]) <= self.model.block_l * 4
             ]
-            random.shuffle(nearby)
-
-            for cell in nearby:
-                path = self.make_bot_path(p, cell)
-                if path:
-                    self.bot_goal[p] = cell
-                    self.bot_paths[p] = path
-                    pu = self.model.powerups[cell]
-                    print(f"{p} powerup: {pu} at {cell}")
-                    return True
+            if not candidates:
+                return False
+            cell = self.rng.choice(candidates)
 
-        return False
+        self.bot_goal[p] = cell
+        self.bot_paths[p] = field.path_to(cell)
+        pu = self.model.powerups[cell]
+        print(f"{p} powerup: {pu} at {cell}")
+        return True
 
     def must_attack(self, p: int) -> bool:
         bot_type = self.bot_players[p]
-        coord = self.model.sprite_coords[p]
-        start = (self.model.snap_x(coord[0]), self.model.snap_y(coord[1]))
+        players = self.model.players
+        coord = self.model.board.coord
 
-        players = [q for q in self.model.sprite_coords if q != p]
-        if not players:
+        if len(players.cell_of) < 2:
             return False
 
-        # POLICY 1: reachable player within A cells (careful / greedy)
+        # POLICY 1: reachable player within A cells (careful / greedy), a local lookup in the index
         if bot_type in ("careful", "greedy"):
             A = 3 if bot_type == "careful" else 6
-
-            for q in players:
-                qx, qy = self.model.sprite_coords[q]
-                goal = (self.model.snap_x(qx), self.model.snap_y(qy))
-
-                if abs(goal[0] - start[0]) + abs(goal[1] - start[1]) <= A * self.model.block_l:
-                    path = self.make_bot_path(p, goal)
-                    if path:
-                        self.bot_goal[p] = goal
-                        self.bot_paths[p] = path
-                        print(f"{p} attack: player {q} at {goal}")
-                        return True
+            near = [q for q in players.within(players.cell_of[p], A) if q != p]
+            if not near:
+                return False
+            field = self.distance_field(p)
+            targets = [(q, coord(players.cell_of[q])) for q in near]
+            targets = [(q, goal) for q, goal in targets if field.reaches(goal)]
+            if not targets:
+                return False
+            q, goal = targets[0]
 
         # POLICY 2: random player (hostile)
         else:
-            shuffled = players[:]
-            random.shuffle(shuffled)
-
-            for q in shuffled:
-                qx, qy = self.model.sprite_coords[q]
-                goal = (self.model.snap_x(qx), self.model.snap_y(qy))
-                path = self.make_bot_path(p, goal)
-                if path:
-                    self.bot_goal[p] = goal
-                    self.bot_paths[p] = path
-                    print(f"{p} attack: player {q} at {goal}")
-                    return True
-
-        return False
+            field = self.distance_field(p)
+            targets = [(q, coord(players.cell_of[q])) for q in self.model.sprite_coords if q != p]
+            targets = [(q, goal) for q, goal in targets if field.reaches(goal)]
+            if not targets:
+                return False
+            q, goal = self.rng.choice(targets)
+
+        self.bot_goal[p] = goal
+        self.bot_paths[p] = field.path_to(goal)
+        print(f"{p} attack: player {q} at {goal}")
+        return True
+
+    def begin_frame(self) -> None:
+        # one frame's wall clock budget, however many ticks the frame runs for catch-up or turbo
+        self.scheduler.begin_frame()
+        if self.planner is not None:
+            self.planner.begin_frame()
+
+    def pacing(self) -> tuple[int, dict[int, int]]:
+        # what the wall clock decided this tick: simulated ticks the planner got before max_ms cut it
+        # (-1 if it wasn't cut) and the bots the scheduler deferred or degraded, the recorder keeps both
+        if self.thought_at != self.model.clock.frame_count:
+            return -1, {}
+        planner = self.planner
+        planned = planner.used if planner is not None and planner.cut else -1
+        return planned, self.scheduler.verdicts
+
+    def follow(self, planned: int, verdicts: dict[int, int]) -> None:
+        # replay: the next tick takes the recorded wall clock decisions instead of its own
+        self.scheduler.script = verdicts
+        if self.planner is not None:
+            self.planner.allowance = None if planned < 0 else planned
 
     def update_bots(self):
+        if not self.paced:
+            self.begin_frame()
+        self.thought_at = self.model.clock.frame_count
+        self.scheduler.begin_tick()
+        # the planner's simulated ticks are per game tick, a replay has no drawn frames to split them by
+        if self.planner is not None:
+            self.planner.begin_tick()
+        t = self.timings
         for p in self.bot_players:
-            if p not in self.model.sprite_coords:
-                if p in self.bot_paths:
-                    del self.bot_paths[p]
-                continue
+            t.mark()
+            self.update_bot(p)
+            t.lap(f"bot {p + 1}")
+
+    def update_bot(self, p: int) -> None:
+        if p not in self.model.sprite_coords:
+            if p in self.bot_paths:
+                del self.bot_paths[p]
+            if self.planner is not None:
+                self.planner.forget(p)
+            self.scheduler.forget(p)
+            return
 
-            x, y = self.model.sprite_coords[p]
+        if self.bot_players[p] == "planner":
+            start = time.perf_counter()
+            self.update_planner(p)
+            self.scheduler.charge(time.perf_counter() - start)
+            return
 
-            if self.reevaluate_condition(p, x, y):
-                self.reevaluate(p, x, y)
+        x, y = self.model.sprite_coords[p]
 
-            if p in self.bot_paths and self.bot_paths[p] != []:
-                next_coord = self.bot_paths[p][0]
+        # a deferred bot already passed its condition, it only waits for room in the frame
+        if self.reevaluate_condition(p, x, y) or self.scheduler.is_waiting(p):
+            self.think(p, x, y)
 
-                self.bot_bomb_place(p, next_coord) # pag may nakaharang na soft block
+        if p in self.bot_paths and self.bot_paths[p] != []:
+            next_coord = self.bot_paths[p][0]
 
-                # para di sila dumeretso if may explosion sa next tile na pupuntahan nila
-                # possible na tatanggalin kasi reevaluate should only happen at most once per tick
-                # pero kasi pag nilalaro ko naaasar ako na dumederetso lang sila sa explosion HAHAHAH
-                self.check_explosion_next_block(p, next_coord)
+            self.bot_bomb_place(p, next_coord) # pag may nakaharang na soft block
 
-                self.move_bot_to(p, next_coord)
+            # para di sila dumeretso if may explosion sa next tile na pupuntahan nila
+            # possible na tatanggalin kasi reevaluate should only happen at most once per tick
+            # pero kasi pag nilalaro ko naaasar ako na dumederetso lang sila sa explosion HAHAHAH
+            self.check_explosion_next_block(p, next_coord)
 
-            """startup"""
-            if (x, y) in self.model.spawn_points and (
-                p not in self.bot_goal or p not in self.bot_paths):
-                self.wander(p)
+            self.move_bot_to(p, next_coord)
+
+        """startup"""
+        if (x, y) in self.model.spawn_points and (
+            p not in self.bot_goal or p not in self.bot_paths):
+            self.wander(p)
+
+    def update_planner(self, p: int) -> None:
+        # search bot, skips reevaluate and follows whatever its last finished rollout picked
+        assert self.planner is not None
+        planner = self.planner
+        x, y = self.model.sprite_coords[p]
+        here = (self.model.snap_x(x), self.model.snap_y(y))
+        path = self.bot_paths.get(p, [])
+
+        if planner.busy(p) or not path or planner.stale(p):
+            plan = planner.think(p)
+            # planned from another cell, it moved while thinking, next plan will catch up
+            if plan is not None and plan.start == here:
+                if plan.bomb:
+                    self.model.place_bomb(p)
+                self.bot_goal[p] = plan.goal
+                self.bot_paths[p] = path = list(plan.path)
+                self.bot_states[p] = "plan"
+
+        # wait for the fire to go out instead of walking into it
+        if path and not self.model.board.has(self.model.board.index(path[0]), FIRE):
+            self.move_bot_to(p, path[0])
+
+    def think(self, p: int, x: int, y: int) -> None:
+        # reevaluate if the frame has room for it, see BotScheduler
+        urgent = self.in_danger((x, y)) and self.escaping_bots[p] == 0
+        mode = self.scheduler.admit(p, urgent)
+        if mode == DEFER:
+            return
+
+        start = time.perf_counter()
+        if mode == FULL:
+            self.reevaluate(p, x, y)
+        else:
+            self.reevaluate_degraded(p, x, y)
+        self.scheduler.done(p, time.perf_counter() - start, mode)
 
     def reevaluate_condition(self, p: int, x: int, y: int) -> bool:
 
         if not self.in_danger((x, y)) and self.escaping_bots[p] == 1:
             self.escaping_bots[p] = 0
 
-        time, chance = self.bot_int_vals[p]
+        _, chance = self.bot_int_vals[p]
 
-        if (pyxel.frame_count % round(30 * time) == 0 and
-        random.randint(0, 99) < chance):
+        # interval per bot type, but each bot on its own frame so they don't all search together
+        if (self.scheduler.due(p, self.model.clock.frame_count) and
+        self.rng.randint(0, 99) < chance):
             
             # not sure if gagana, kasi bigla sila tumitigil, basta pinapawander state pag hindi nasa ibang state
             # nilipat ko lang sa di every frame para may onti silang pahinga HAHAHAHA
             if p not in self.bot_paths or self.bot_paths[p] == []:
                 self.wander(p)
 
-            five_cell_coords = [ (i, j)
-                for i in range(x - self.model.block_l * 5,
-                    x + self.model.block_l * 5 + 1,
-                    self.model.block_l)
-                for j in range(y - self.model.block_l * 5,
-                    y + self.model.block_l * 5 + 1,
-                    self.model.block_l)]
-            
+            # a new bomb on the 11x11 grid of cells around the bot, checked on the offsets
+            # instead of listing those cells and searching the list for every bomb
+            bl = self.model.block_l
             explosion_ended = self.prev_explosions and not self.model.explosions
 
             new_bombs = self.model.all_bombs - self.prev_bombs
-            new_bomb_near = any(bomb in five_cell_coords for bomb in new_bombs)
+            new_bomb_near = any((bx - x) % bl == 0 and (by - y) % bl == 0
+                and abs(bx - x) <= bl * 5 and abs(by - y) <= bl * 5 for bx, by in new_bombs)
 
             """conditions bago magstart reevaluation according sa instructions"""
             if explosion_ended or new_bomb_near:
@@ -1008,7 +1159,7 @@ class Bots:
             
             return False
                     
-        if pyxel.frame_count % 30 == 1: 
+        if self.model.clock.frame_count % 30 == 1: 
             self.prev_explosions = self.model.explosions.copy()
             self.prev_bombs = self.model.all_bombs.copy()
         
@@ -1035,8 +1186,9 @@ class Bots:
         self.wander(p)
         return
 
-
-
-
-
-
+    def reevaluate_degraded(self, p: int, x: int, y: int) -> None:
+        # no room left this frame, skip the powerup and attack searches and only run if needed
+        if self.in_danger((x, y), p) and self.escaping_bots[p] == 0:
+            self.escape(p)
+        elif p not in self.bot_paths or not self.bot_paths[p]:
+            self.wander(p)
@@ -0,0 +1,101 @@
+# pyright: strict
+from array import array
+from .board import Board, WALKABLE
+
+class DistanceField:
+    # result of one full search from a single start cell, read by every decision of a bot in a tick
+    def __init__(self, finder: "GridPathfinder"):
+        n = finder.board.size
+        self.finder = finder
+        self.dist = array("i", [-1]) * n
+        self.prev = array("i", [-1]) * n
+        self.seen = array("I", [0]) * n
+        self.order = array("i", [0]) * n # cells in bfs order, nearest first
+        self.count = 0
+        self.stamp = 0
+        self.start = -1
+        self.key: tuple[int, ...] | None = None # what the field was built for, set by the caller
+
+    def reaches(self, coord: tuple[int, int]) -> bool:
+        i = self.finder.index(coord)
+        return i >= 0 and self.seen[i] == self.stamp
+
+    def distance(self, coord: tuple[int, int]) -> int:
+        # -1 if unreachable
+        i = self.finder.index(coord)
+        if i < 0 or self.seen[i] != self.stamp:
+            return -1
+        return self.dist[i]
+
+    def path_to(self, coord: tuple[int, int]) -> list[tuple[int, int]]:
+        i = self.finder.index(coord)
+        if i < 0 or self.seen[i] != self.stamp:
+            return []
+        path: list[tuple[int, int]] = []
+        prev = self.prev
+        while i != -1:
+            path.append(self.finder.coord(i))
+            i = prev[i]
+        path.reverse()
+        return path
+
+class GridPathfinder:
+    # breadth first search over board cells, every edge costs 1 so no dijkstra needed
+    # reads the board flags directly, a search only writes into the DistanceField's preallocated buffers
+    def __init__(self, board: Board):
+        self.board = board
+        self.cols = board.cols
+        self.rows = board.rows
+        self.steps = board.steps
+
+    def index(self, coord: tuple[int, int]) -> int:
+        return self.board.index(coord)
+
+    def coord(self, i: int) -> tuple[int, int]:
+        return self.board.coord(i)
+
+    def flood(self, start: tuple[int, int], field: DistanceField, blocked: int, depth: int | None = None) -> DistanceField:
+        # no goal, visits every walkable cell reachable from start without touching a blocked flag
+        # depth stops it that many steps out, cells past it count as unreachable
+        field.stamp += 1
+        if field.stamp == 0xFFFFFFFF:
+            field.seen[:] = array("I", [0]) * len(field.seen)
+            field.stamp = 1
+        field.count = 0
+        s = field.start = self.index(start)
+        flags = self.board.flags
+        mask = WALKABLE | blocked
+        if s < 0 or flags[s] & mask != WALKABLE:
+            return field
+
+        stamp = field.stamp
+        seen = field.seen
+        dist = field.dist
+        prev = field.prev
+        order = field.order
+        steps = self.steps
+
+        seen[s] = stamp
+        dist[s] = 0
+        prev[s] = -1
+        order[0] = s
+        head, tail = 0, 1
+        limit = depth if depth is not None else len(flags)
+
+        while head < tail:
+            cur = order[head]
+            head += 1
+            d = dist[cur] + 1
+            if d > limit:
+                break # bfs order, everything after this is just as far
+            for step in steps:
+                nxt = cur + step
+                if flags[nxt] & mask == WALKABLE and seen[nxt] != stamp:
+                    seen[nxt] = stamp
+                    dist[nxt] = d
+                    prev[nxt] = cur
+                    order[tail] = nxt
+                    tail += 1
+
+        field.count = tail
+        return field
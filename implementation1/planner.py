@@ -0,0 +1,247 @@
+# pyright: strict
+import time
+from typing import Generator, Iterator, TYPE_CHECKING
+from .clock import TickClock
+from .board import SOFT, BOMB, FIRE, DANGER
+from .pathfinding import GridPathfinder, DistanceField
+from .snapshot import Snapshot, take_snapshot, restore_snapshot
+
+if TYPE_CHECKING:
+    from .model import Model
+
+Coord = tuple[int, int]
+
+class Plan:
+    # where to walk from start, and whether to drop a bomb before leaving
+    def __init__(self, start: Coord, path: list[Coord], bomb: bool, score: float):
+        self.start = start
+        self.path = path
+        self.goal = path[-1]
+        self.bomb = bomb
+        self.score = score
+
+class RolloutPlanner:
+    # picks a move by playing every option forward on a scratch copy of the model
+    # work is counted in simulated ticks, ticks_per_frame every game tick, so a seeded match plays the same
+    # however its ticks are grouped into drawn frames
+    # max_ms is only a safety cap per drawn frame for machines too slow for that, None turns it off
+    # (every time it cuts a tick short is counted in overruns, the replay records where so it can cut there too)
+    DEATH = -10_000.0
+
+    def __init__(self, model: "Model", horizon: int = 90, ticks_per_frame: int = 200, max_ms: float | None = 12.0, goals: int = 12):
+        self.model = model
+        self.horizon = horizon
+        self.ticks_per_frame = ticks_per_frame # shared by every planner bot
+        self.max_ms = max_ms
+        self.goals = goals
+        self.finder = GridPathfinder(model.board)
+        self.field = DistanceField(self.finder)
+        self.scratch: dict[int, "Model"] = {}
+        self.thinking: dict[int, Iterator[Plan | None]] = {}
+        self.roots: dict[int, tuple[int, tuple[int, int, int]]] = {} # p -> (frame, world key) of the last plan
+        self.budget = 0
+        self.used = 0 # simulated ticks spent this tick
+        self.cut = False # max_ms stopped this tick's thinking early
+        self.allowance: int | None = None # a replay's simulated ticks for this tick, instead of the clock
+        self.deadline = 0.0
+        self.overruns = 0
+
+    def world_key(self) -> tuple[int, int, int]:
+        # changes whenever a bomb is placed, a blast starts or ends, or a powerup appears or is taken
+        m = self.model
+        return (m.fuses.placed, len(m.flames.active), len(m.powerups))
+
+    def busy(self, p: int) -> bool:
+        return p in self.thinking
+
+    def stale(self, p: int) -> bool:
+        if p not in self.roots:
+            return True
+        frame, key = self.roots[p]
+        return key != self.world_key() or self.model.clock.frame_count - frame >= 30
+
+    def forget(self, p: int) -> None:
+        self.thinking.pop(p, None)
+        self.roots.pop(p, None)
+
+    def begin_tick(self) -> None:
+        self.budget = self.ticks_per_frame if self.allowance is None else self.allowance
+        self.used = 0
+        self.cut = False
+
+    def begin_frame(self) -> None:
+        self.deadline = time.perf_counter() + self.max_ms / 1000 if self.max_ms is not None else float("inf")
+
+    def think(self, p: int) -> Plan | None:
+        # spends what is left of this tick's budget, None until the plan is done
+        frame = self.model.clock.frame_count
+        if p not in self.thinking:
+            self.roots[p] = (frame, self.world_key())
+            self.thinking[p] = self.deliberate(p)
+
+        gen = self.thinking[p]
+        clock = time.perf_counter
+        while self.budget > 0:
+            if clock() >= self.deadline:
+                self.budget = 0
+                self.cut = True
+                self.overruns += 1
+                break
+            self.budget -= 1
+            self.used += 1
+            plan = next(gen)
+            if plan is not None:
+                del self.thinking[p]
+                return plan
+        return None
+
+    def scratch_for(self, p: int) -> "Model":
+        # same walls and hard blocks as the real board, everything else comes from the snapshot
+        if p not in self.scratch:
+            m = self.model
+            s = type(m)(m.y_origin, m.block_l, clock=TickClock(), cols=m.cols, rows=m.rows)
+            s.generate_walls()
+            s.generate_hard_blocks()
+            s.generate_walkable_coords()
+            s.rng.seed(p) # powerup rolls inside a rollout, never the real stream
+            self.scratch[p] = s
+        return self.scratch[p]
+
+    """search"""
+
+    def deliberate(self, p: int) -> Generator[Plan | None, None, None]:
+        m = self.model
+        root = take_snapshot(m, with_rng=False)
+        x, y = m.sprite_coords[p]
+        start = (m.snap_x(x), m.snap_y(y))
+        s = self.scratch_for(p)
+        s.player_number = m.player_number
+        s.powerup_percent = m.powerup_percent
+
+        best: Plan | None = None
+        for path, bomb in self.options(p, start):
+            score = yield from self.rollout(s, root, p, path, bomb)
+            if score > self.DEATH / 2:
+                score += self.value(p, start, path, bomb)
+            if best is None or score > best.score:
+                best = Plan(start, path, bomb, score)
+        assert best is not None # staying put is always an option
+        yield best
+
+    def options(self, p: int, start: Coord) -> list[tuple[list[Coord], bool]]:
+        m = self.model
+        board = m.board
+        flags = board.flags
+        field = self.field
+
+        on_bomb = board.has(board.index(start), BOMB)
+        blocked = FIRE | SOFT if on_bomb else FIRE | SOFT | BOMB
+        self.finder.flood(start, field, blocked, m.search_depth)
+        order = [field.order[k] for k in range(field.count)]
+
+        picks: list[int] = order[:7] # start and the nearest cells
+        # cells to bomb soft blocks from
+        picks += [c for c in order[1:40] if any(flags[c + step] & SOFT for step in board.steps)][:3]
+        # powerups and opponents that can be walked to
+        picks += [board.index(c) for c in m.powerups if field.reaches(c)][:3]
+        for q, c in m.players.cell_of.items():
+            if q != p and field.reaches(board.coord(c)):
+                picks.append(c)
+
+        goals: list[int] = []
+        for c in picks:
+            if c >= 0 and c not in goals and len(goals) < self.goals:
+                goals.append(c)
+        if field.start not in goals:
+            goals.insert(0, field.start)
+
+        paths = [field.path_to(board.coord(c)) for c in goals]
+        options = [(path, False) for path in paths if path]
+        if not on_bomb and m.num_bombs_per_p[p] < m.max_bombs_per_p[p]:
+            # bomb here, then run, the rollout tells if the run is far enough
+            options += [(path, True) for path in paths if 1 < len(path) <= 9]
+        if not options:
+            options = [([start], False)]
+        return options
+
+    def rollout(self, s: "Model", root: Snapshot, p: int, path: list[Coord], bomb: bool) -> Generator[None, None, float]:
+        # only this bot moves, everyone else stands still with their bombs ticking
+        restore_snapshot(s, root)
+        if bomb:
+            s.place_bomb(p)
+        stats = s.exp_range_per_p[p] + s.max_bombs_per_p[p] + s.move_spd_per_p[p]
+        goal = s.board.index(path[-1])
+        flags = s.board.flags
+
+        k = 0
+        t = 0
+        for t in range(self.horizon):
+            yield None
+            if k < len(path):
+                k = self.follow(s, p, path, k)
+            s.update_game_state()
+            s.clock.tick()
+            if p not in s.sprite_coords:
+                return self.DEATH + t # later is less bad, a replan may still find a way out
+            # arrived and no bomb on the board reaches the goal, nothing can change from here
+            if k >= len(path) and not flags[goal] & (DANGER | FIRE):
+                break
+        else:
+            if flags[goal] & (DANGER | FIRE):
+                return -500.0 # alive at the horizon but still waiting on a blast
+
+        gained = s.exp_range_per_p[p] + s.max_bombs_per_p[p] + s.move_spd_per_p[p] - stats
+        return 60.0 * gained - 0.5 * t
+
+    def follow(self, s: "Model", p: int, path: list[Coord], k: int) -> int:
+        # same steps as Bots.move_bot_to, returns the index of the next path cell
+        x, y = s.sprite_coords[p]
+        nx, ny = path[k]
+        speed = s.move_spd_per_p[p]
+
+        if abs(x - nx) <= speed and abs(y - ny) <= speed:
+            s.sprite_coords[p] = [nx, ny]
+            s.track(p)
+            return k + 1
+
+        dx = nx - x
+        dy = ny - y
+        if abs(dx) > abs(dy):
+            if dx < 0:
+                s.move_left(p)
+            elif dx > 0:
+                s.move_right(p)
+        else:
+            if dy < 0:
+                s.move_up(p)
+            elif dy > 0:
+                s.move_down(p)
+        return k
+
+    def value(self, p: int, start: Coord, path: list[Coord], bomb: bool) -> float:
+        # what a surviving option is worth, on top of the powerups picked up on the way
+        m = self.model
+        board = m.board
+        flags = board.flags
+        rng = m.exp_range_per_p[p]
+        score = -2.0 * (len(path) - 1)
+
+        foes = [c for q, c in m.players.cell_of.items() if q != p]
+        if bomb:
+            cells = m.danger.blast_cells(board.index(start), rng)
+            soft = sum(1 for c in cells if flags[c] & SOFT)
+            hits = sum(1 for c in foes if c in cells)
+            score += 25.0 * soft + 120.0 * hits
+            if soft == 0 and hits == 0:
+                score -= 40.0 # wasted bomb, and one less to use for a while
+        else:
+            # a good spot to bomb from next time
+            cells = m.danger.blast_cells(board.index(path[-1]), rng)
+            score += 8.0 * sum(1 for c in cells if flags[c] & SOFT)
+
+        # drift towards the nearest opponent
+        gx, gy = path[-1]
+        if foes:
+            d = min(abs(gx - fx) + abs(gy - fy) for fx, fy in (board.coord(c) for c in foes))
+            score -= 1.5 * d / m.block_l
+        return score
@@ -0,0 +1,105 @@
+# pyright: strict
+import argparse, cProfile, glob, json, os, pstats
+from typing import Any
+from .model import Model
+
+class RoundProfiler:
+    # cProfile over one round, saved when the round ends as round-<seed>-<round>.prof plus a .json with who played
+    # rounds=None captures every round, for collecting many headless rounds and merging them with main() below
+    def __init__(self, rounds: set[int] | None = None, directory: str = "profiles"):
+        self.rounds = rounds
+        self.directory = directory
+        self.profile: cProfile.Profile | None = None
+        self.round_number: int = 0
+        self.start_tick: int = 0
+        self.now: bool = False # capture the round being played, set by the hotkey
+        self.done: set[int] = set()
+        self.saved: list[str] = []
+
+    @property
+    def active(self) -> bool:
+        return self.profile is not None
+
+    def capture_current(self) -> None:
+        self.now = True
+
+    def wants(self, model: Model) -> bool:
+        if model.round_transition_active or model.overall_game_over:
+            return False
+        r = model.round_number
+        if r in self.done:
+            return self.now
+        return self.now or self.rounds is None or r in self.rounds
+
+    def start(self, model: Model) -> None:
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # another profiler is already running, like python -m cProfile
+            print("profiler: another profiler is active, round not captured")
+            self.now = False
+            self.done.add(model.round_number)
+            return
+        self.profile = profile
+        self.round_number = model.round_number
+        self.start_tick = model.clock.frame_count
+        self.now = False
+
+    def finish(self, model: Model, seed: int, lineup: list[str]) -> str | None:
+        # at handle_round_end, the finished round is still model.round_number
+        profile = self.profile
+        if profile is None:
+            return None
+        profile.disable()
+        self.profile = None
+        self.done.add(self.round_number)
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"round-{seed}-{self.round_number}.prof")
+        profile.dump_stats(path)
+        meta: dict[str, Any] = {
+            "seed": seed,
+            "round": self.round_number,
+            "lineup": lineup,
+            "winner": None if model.round_winner is None else model.round_winner + 1,
+            "ticks": model.clock.frame_count - self.start_tick,
+        }
+        with open(path[:-len(".prof")] + ".json", "w") as f:
+            json.dump(meta, f)
+        self.saved.append(path)
+        return path
+
+def load_meta(path: str) -> dict[str, Any]:
+    with open(path[:-len(".prof")] + ".json", "r") as f:
+        return json.load(f)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Merge round profiles and print the hot spots.")
+    parser.add_argument("directory", nargs="?", default="profiles")
+    parser.add_argument("--bot", default=None, help="only rounds where this bot type played")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--sort", default="cumulative", help="any pstats sort key, e.g. tottime")
+    parser.add_argument("--top", type=int, default=30)
+    args = parser.parse_args()
+
+    paths: list[str] = []
+    ticks = 0
+    for path in sorted(glob.glob(os.path.join(args.directory, "*.prof"))):
+        meta = load_meta(path)
+        if args.bot is not None and args.bot not in meta["lineup"]:
+            continue
+        if args.seed is not None and meta["seed"] != args.seed:
+            continue
+        paths.append(path)
+        ticks += meta["ticks"]
+    if not paths:
+        parser.error(f"no matching profiles in {args.directory}")
+
+    print(f"{len(paths)} rounds, {ticks} ticks")
+    stats = pstats.Stats(*paths)
+    stats.files = [args.directory] # one line instead of one per merged file
+    stats.sort_stats(args.sort).print_stats(args.top)
+
+if __name__ == "__main__":
+    main()
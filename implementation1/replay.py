@@ -0,0 +1,107 @@
+# pyright: strict
+import hashlib, json, os, struct, zlib
+from typing import Any, Iterator, Sequence
+from .model import Model
+
+# file layout: header, settings json, then zlib of one frame per tick
+# frame = flag byte (ESCAPE, PACED) + one key byte per human player (bits from engine.KEY_*)
+# a PACED frame goes on with what the wall clock decided for the bots that tick, see Bots.pacing:
+# uint16 planner ticks + 1 (0 if max_ms didn't cut it), count, then (player, verdict) byte pairs
+MAGIC = b"BMRP"
+VERSION = 3
+ESCAPE = 1
+PACED = 2
+HEADER = struct.Struct("<4sBQIIB16s") # magic, version, seed, frames, settings length, humans, digest
+
+def state_digest(model: Model) -> bytes:
+    # fingerprint of everything that decides the game, equal digests mean an exact replay
+    h = hashlib.blake2b(digest_size=16)
+    h.update(bytes(model.board.flags))
+    h.update(repr(sorted((p, tuple(c)) for p, c in model.sprite_coords.items())).encode())
+    h.update(repr(sorted(model.powerups.items())).encode())
+    h.update(repr(sorted(model.fuses.due.items())).encode())
+    h.update(repr(sorted(model.round_wins.items())).encode())
+    h.update(repr((model.round_number, model.game_tick, model.clock.frame_count)).encode())
+    return h.digest()
+
+class InputRecorder:
+    # keeps every tick's keys in memory and rewrites the file whenever save is called
+    def __init__(self, directory: str = "replays"):
+        self.directory = directory
+        self.path: str = ""
+        self.seed: int = 0
+        self.settings: dict[str, Any] = {}
+        self.humans: int = 0
+        self.frames = bytearray()
+        self.count: int = 0
+
+    def begin(self, seed: int, settings: dict[str, Any]) -> None:
+        self.seed = seed
+        self.settings = settings
+        self.humans = settings["human_player_number"]
+        self.path = os.path.join(self.directory, f"match-{seed}.bmr")
+        self.frames.clear()
+        self.count = 0
+
+    def record(self, keys: Sequence[int], escape: bool, planned: int = -1, verdicts: dict[int, int] | None = None) -> None:
+        paced = planned >= 0 or bool(verdicts)
+        self.frames.append((ESCAPE if escape else 0) | (PACED if paced else 0))
+        for p in range(self.humans):
+            self.frames.append(keys[p] if p < len(keys) else 0)
+        if paced:
+            verdicts = verdicts or {}
+            self.frames += (planned + 1).to_bytes(2, "little")
+            self.frames.append(len(verdicts))
+            for p, mode in verdicts.items():
+                self.frames += bytes((p, mode))
+        self.count += 1
+
+    def save(self, model: Model) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        settings = json.dumps(self.settings).encode()
+        header = HEADER.pack(MAGIC, VERSION, self.seed, self.count, len(settings), self.humans, state_digest(model))
+        with open(self.path, "wb") as f:
+            f.write(header)
+            f.write(settings)
+            f.write(zlib.compress(bytes(self.frames), 9))
+        return self.path
+
+class Replay:
+    def __init__(self, seed: int, settings: dict[str, Any], humans: int, count: int, frames: bytes, digest: bytes):
+        self.seed = seed
+        self.settings = settings
+        self.humans = humans
+        self.count = count
+        self.data = frames
+        self.digest = digest # state at the moment the file was written
+
+    @classmethod
+    def load(cls, path: str) -> "Replay":
+        with open(path, "rb") as f:
+            raw = f.read()
+        magic, version, seed, count, settings_len, humans, digest = HEADER.unpack_from(raw)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a replay this version can read")
+        start = HEADER.size
+        settings = json.loads(raw[start:start + settings_len])
+        frames = zlib.decompress(raw[start + settings_len:])
+        return cls(seed, settings, humans, count, frames, digest)
+
+    def frames(self) -> Iterator[tuple[list[int], bool, int, dict[int, int]]]:
+        # keys, escape, then the bots' wall clock decisions for Bots.follow
+        data = self.data
+        k = 0
+        for _ in range(self.count):
+            flags = data[k]
+            keys = list(data[k + 1:k + 1 + self.humans])
+            k += 1 + self.humans
+            planned = -1
+            verdicts: dict[int, int] = {}
+            if flags & PACED:
+                planned = int.from_bytes(data[k:k + 2], "little") - 1
+                n = data[k + 2]
+                k += 3
+                for j in range(k, k + 2 * n, 2):
+                    verdicts[data[j]] = data[j + 1]
+                k += 2 * n
+            yield keys, bool(flags & ESCAPE), planned, verdicts
@@ -0,0 +1,96 @@
+# pyright: strict
+
+# what admit tells a bot that wants to reevaluate this frame
+FULL = 0
+DEFER = 1 # try again next frame
+DEGRADE = 2 # only the cheap escape check
+
+class BotScheduler:
+    # spreads bot reevaluation over frames, and keeps it inside what the frame has left
+    # the budget is measured: frame time minus the moving average of everything that is not bot thinking
+    def __init__(self, fps: int = 30, share: float = 0.8, max_defer: int = 3, alpha: float = 0.1):
+        self.frame_s = 1 / fps
+        self.share = share # part of the frame we let update + draw use, the rest is slack for pyxel
+        self.max_defer = max_defer # frames a bot may wait before it gets the cheap reevaluate anyway
+        self.alpha = alpha # weight of the newest sample in the moving averages
+        self.limit = True # False never defers, the headless runner has no frame to keep up with
+
+        self.period: dict[int, int] = {} # frames between reevaluate checks per bot
+        self.offset: dict[int, int] = {}
+        self.waiting: dict[int, int] = {} # p -> frames deferred so far
+        self.cost: dict[int, float] = {} # seconds per full reevaluate, moving average per bot
+        self.other: float = 0.0 # seconds per frame spent on the game and the draw
+        self.draw: float = 0.0
+        self.spent: float = 0.0 # bot thinking so far this frame
+        self.verdicts: dict[int, int] = {} # p -> DEFER or DEGRADE handed out this tick, the replay keeps them
+        self.script: dict[int, int] | None = None # a replay's verdicts for this tick, instead of the clock
+
+        self.full = 0
+        self.deferred = 0
+        self.degraded = 0
+
+    def assign(self, periods: dict[int, int]) -> None:
+        # bots with the same interval no longer all think on the same frame
+        self.period = dict(periods)
+        n = len(periods)
+        for k, (p, period) in enumerate(periods.items()):
+            self.offset[p] = k * period // n if n else 0
+        self.waiting.clear()
+
+    def due(self, p: int, frame: int) -> bool:
+        return (frame + self.offset[p]) % self.period[p] == 0
+
+    def is_waiting(self, p: int) -> bool:
+        return p in self.waiting
+
+    def forget(self, p: int) -> None:
+        self.waiting.pop(p, None)
+
+    def budget(self) -> float:
+        # seconds left for bots in a whole frame
+        return max(self.share * self.frame_s - self.other, 0.0)
+
+    def begin_frame(self) -> None:
+        self.spent = 0.0
+
+    def begin_tick(self) -> None:
+        self.verdicts = {}
+
+    def charge(self, seconds: float) -> None:
+        # bot work that isn't a reevaluate, like the planner, still uses up the frame
+        self.spent += seconds
+
+    def admit(self, p: int, urgent: bool) -> int:
+        if self.script is not None:
+            mode = self.script.get(p, FULL)
+        elif not self.limit or self.cost.get(p, 0.0) <= self.budget() - self.spent:
+            mode = FULL
+        # in danger or waited long enough, think cheaply now instead of not at all
+        elif urgent or self.waiting.get(p, 0) >= self.max_defer:
+            mode = DEGRADE
+        else:
+            mode = DEFER
+        if mode == DEFER:
+            self.waiting[p] = self.waiting.get(p, 0) + 1
+            self.deferred += 1
+        if mode != FULL:
+            self.verdicts[p] = mode
+        return mode
+
+    def done(self, p: int, seconds: float, mode: int) -> None:
+        self.spent += seconds
+        self.waiting.pop(p, None)
+        if mode == FULL:
+            self.full += 1
+            old = self.cost.get(p)
+            self.cost[p] = seconds if old is None else old + self.alpha * (seconds - old)
+        else:
+            self.degraded += 1
+
+    def note_draw(self, seconds: float) -> None:
+        self.draw = seconds
+
+    def end_frame(self, update_seconds: float) -> None:
+        # whole engine update minus bot thinking, plus the last draw
+        sample = max(update_seconds - self.spent, 0.0) + self.draw
+        self.other += self.alpha * (sample - self.other)
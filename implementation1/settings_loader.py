@@ -1,6 +1,8 @@
 # pyright: strict
 import json, sys
 
+SPECTATOR_SPEEDS = (1, 2, 4, 8, 16, 32, 64)
+
 def load_settings(path: str = "settings.json"):
     try:
         with open(path, "r") as f:
@@ -13,12 +15,12 @@ def load_settings(path: str = "settings.json"):
         "soft_block_percent": (0, 100),
         "powerup_percent": (0, 100),
         "timer_seconds": (30, 600),
-        "human_player_number": (1, 2), # only player 1 and 2 can be human
-        "total_player_number": (2, 4),
+        "human_player_number": (0, 2), # only player 1 and 2 can be human, 0 to just watch the bots
+        "total_player_number": (2, 16),
         "rounds_to_win": (1, 4) #placeholder lang
         }
 
-    str_required = {"bot_types": ("hostile", "careful", "greedy")}
+    str_required = {"bot_types": ("hostile", "careful", "greedy", "planner")}
 
     for key, (min, max) in num_required.items():
         if key not in settings:
@@ -62,4 +64,52 @@ def load_settings(path: str = "settings.json"):
             print("Error: 'rounds_to_win' must be between 1 and 4, inclusive.")
             sys.exit(1)
 
+    # optional switches, off if missing
+    bool_optional = ("record_inputs",)
+
+    for key in bool_optional:
+        if key in settings and type(settings[key]) is not bool:
+            print(f"Error: '{key}' must be true or false.")
+            sys.exit(1)
+
+    # board size, 15x13 if missing
+    int_optional = {
+        "board_cols": (7, 101),
+        "board_rows": (7, 101),
+        }
+
+    for key, (min, max) in int_optional.items():
+        if key not in settings:
+            continue
+
+        if type(settings[key]) is not int:
+            print(f"Error: '{key}' must be an integer.")
+            sys.exit(1)
+
+        if not (min <= settings[key] <= max) or settings[key] % 2 == 0:
+            print(f"Error: '{key}' must be an odd number between {min} and {max}, inclusive.")
+            sys.exit(1)
+
+    # spectator speed at the start, changed live with - and =
+    if "spectator_speed" in settings:
+        speed = settings["spectator_speed"]
+        if type(speed) is not int or speed not in SPECTATOR_SPEEDS:
+            print(f"Error: 'spectator_speed' must be one of {SPECTATOR_SPEEDS}.")
+            sys.exit(1)
+
+    # cProfile this round, written to profiles/ when it ends
+    if "profile_round" in settings:
+        r = settings["profile_round"]
+        if type(r) is not int or r < 1:
+            print("Error: 'profile_round' must be a round number, 1 or more.")
+            sys.exit(1)
+
+    # every spawn is on a cell with an odd column and row
+    cols = settings.get("board_cols", 15)
+    rows = settings.get("board_rows", 13)
+    seats = ((cols - 1) // 2) * ((rows - 1) // 2)
+    if settings["total_player_number"] > seats:
+        print(f"Error: a {cols}x{rows} board has room for at most {seats} players.")
+        sys.exit(1)
+
     return settings
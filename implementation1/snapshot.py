@@ -0,0 +1,126 @@
+# pyright: strict
+import pickle
+from collections import deque
+from typing import Any, TYPE_CHECKING
+from .flames import Blast
+
+if TYPE_CHECKING:
+    from .model import Model # model imports the planner, which imports this
+
+class Snapshot:
+    # everything Model needs to continue a round from this exact tick
+    # grids are raw bytes, blasts are shared since they never change after ignite
+    __slots__ = ("flags", "counts", "fire_count", "blasts", "fire_at", "danger_bombs", "danger_trigger",
+        "danger_touched", "danger_dirty", "danger_hits", "danger_stopped", "fuse_due", "fuse_heap", "fuse_placed", "bomb_owner", "num_bombs",
+        "players", "cells", "exp_range", "max_bombs", "move_spd", "powerups", "new_powerups", "rng", "timers", "rounds")
+
+    def __init__(self):
+        self.flags: bytes = b""
+        self.counts: dict[int, int] = {}
+        self.fire_count: bytes = b""
+        self.blasts: tuple[Blast, ...] = ()
+        self.fire_at: bytes = b""
+        self.danger_bombs: dict[int, tuple[int, int]] = {}
+        self.danger_trigger: dict[int, int] = {}
+        self.danger_touched: list[int] = []
+        self.danger_dirty: bool = False
+        self.danger_hits: dict[int, tuple[tuple[int, int], ...]] = {}
+        self.danger_stopped: dict[int, tuple[int, ...]] = {}
+        self.fuse_due: dict[tuple[int, int], int] = {}
+        self.fuse_heap: list[tuple[int, int, tuple[int, int]]] = []
+        self.fuse_placed: int = 0
+        self.bomb_owner: dict[tuple[int, int], int] = {}
+        self.num_bombs: dict[int, int] = {}
+        self.players: tuple[tuple[int, int, int], ...] = ()
+        self.cells: tuple[tuple[int, int], ...] = ()
+        self.exp_range: dict[int, int] = {}
+        self.max_bombs: dict[int, int] = {}
+        self.move_spd: dict[int, int] = {}
+        self.powerups: dict[tuple[int, int], str] = {}
+        self.new_powerups: frozenset[tuple[int, int]] = frozenset()
+        self.rng: Any = None
+        self.timers: tuple[Any, ...] = ()
+        self.rounds: tuple[Any, ...] = ()
+
+    def pack(self) -> bytes:
+        # for checkpoints on disk, not needed for in-memory rollback
+        return pickle.dumps({k: getattr(self, k) for k in self.__slots__}, pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "Snapshot":
+        snap = cls()
+        for k, v in pickle.loads(data).items():
+            setattr(snap, k, v)
+        return snap
+
+def take_snapshot(model: "Model", with_rng: bool = True) -> Snapshot:
+    s = Snapshot()
+    s.flags = bytes(model.board.flags)
+    s.counts = model.board.counts.copy()
+    s.fire_count = model.flames.count.tobytes()
+    s.blasts = tuple(model.flames.active)
+    danger = model.danger
+    s.fire_at = danger.fire_at.tobytes()
+    s.danger_bombs = danger.bombs.copy()
+    s.danger_trigger = danger.trigger.copy()
+    s.danger_touched = danger.touched.copy()
+    s.danger_dirty = danger.dirty
+    s.danger_hits = danger.hits.copy() # the tuples are never changed, only replaced
+    s.danger_stopped = danger.stopped.copy()
+    s.fuse_due = model.fuses.due.copy()
+    s.fuse_heap = model.fuses.heap.copy()
+    s.fuse_placed = model.fuses.placed
+    s.bomb_owner = model.bomb_owner.copy()
+    s.num_bombs = model.num_bombs_per_p.copy()
+    s.players = tuple((p, x, y) for p, (x, y) in model.sprite_coords.items())
+    s.cells = model.players.state()
+    s.exp_range = model.exp_range_per_p.copy()
+    s.max_bombs = model.max_bombs_per_p.copy()
+    s.move_spd = model.move_spd_per_p.copy()
+    s.powerups = model.powerups.copy()
+    s.new_powerups = frozenset(model.new_power_up_coords)
+    # rng state is ~2.5 KB, lookahead that doesn't roll powerups can skip it
+    s.rng = model.rng.getstate() if with_rng else None
+    s.timers = (model.game_tick, model.clock.frame_count, model.start_frame, model.timer_seconds,
+        model.game_over, model.game_over_time, model.game_over_text, model.countdown_time, model.countdown_finished)
+    s.rounds = (model.round_number, model.round_end_frame, model.overall_game_over, model.round_wins.copy(),
+        model.round_winner, model.round_transition_active, model.round_results_text, model.round_start_frame)
+    return s
+
+def restore_snapshot(model: "Model", s: Snapshot) -> None:
+    board = model.board
+    board.flags[:] = s.flags # in place, the pathfinder holds on to this bytearray
+    board.counts.update(s.counts)
+    board.version += 1 # any cached distance field is stale now
+    memoryview(model.flames.count).cast("B")[:] = s.fire_count
+    model.flames.active = deque(s.blasts)
+    danger = model.danger
+    memoryview(danger.fire_at).cast("B")[:] = s.fire_at
+    danger.bombs = s.danger_bombs.copy()
+    danger.trigger = s.danger_trigger.copy()
+    danger.touched = s.danger_touched.copy()
+    danger.dirty = s.danger_dirty
+    danger.hits = s.danger_hits.copy()
+    danger.stopped = s.danger_stopped.copy()
+    model.fuses.due = s.fuse_due.copy()
+    model.fuses.heap = s.fuse_heap.copy()
+    model.fuses.placed = s.fuse_placed
+    model.bomb_owner = s.bomb_owner.copy()
+    model.num_bombs_per_p = s.num_bombs.copy()
+    model.sprite_coords = {p: [x, y] for p, x, y in s.players}
+    model.players.load(s.cells)
+    model.exp_range_per_p = s.exp_range.copy()
+    model.max_bombs_per_p = s.max_bombs.copy()
+    model.move_spd_per_p = s.move_spd.copy()
+    model.powerups = s.powerups.copy()
+    model.new_power_up_coords = set(s.new_powerups)
+    model.map_changed() # soft blocks may have come back
+    if s.rng is not None:
+        model.rng.setstate(s.rng)
+    (model.game_tick, model.clock.frame_count, model.start_frame, model.timer_seconds,
+        model.game_over, model.game_over_time, model.game_over_text, model.countdown_time,
+        model.countdown_finished) = s.timers
+    (model.round_number, model.round_end_frame, model.overall_game_over, round_wins,
+        model.round_winner, model.round_transition_active, model.round_results_text,
+        model.round_start_frame) = s.rounds
+    model.round_wins = round_wins.copy()
@@ -0,0 +1,72 @@
+# pyright: strict
+from .board import Board
+
+class CellIndex:
+    # which players stand in which board cell, by the same snapped position deaths and pickups use
+    # only touched when a player crosses into another cell, not on every pixel of movement
+    # players only: bombs are already indexed by cell as the BOMB flag on the board (and listed by board.cells),
+    # powerups by the dict keyed on their snapped cell, a second copy here would only have to be kept in sync
+    def __init__(self, board: Board):
+        self.board = board
+        self.cell_of: dict[int, int] = {} # p -> cell
+        self.at: dict[int, list[int]] = {} # cell -> players in it, only occupied cells are kept
+
+    def move(self, p: int, cell: int) -> None:
+        old = self.cell_of.get(p)
+        if old == cell:
+            return
+        if old is not None:
+            self._leave(p, old)
+        self.cell_of[p] = cell
+        self.at.setdefault(cell, []).append(p)
+
+    def remove(self, p: int) -> None:
+        old = self.cell_of.pop(p, None)
+        if old is not None:
+            self._leave(p, old)
+
+    def _leave(self, p: int, cell: int) -> None:
+        ps = self.at[cell]
+        ps.remove(p)
+        if not ps:
+            del self.at[cell]
+
+    def clear(self) -> None:
+        self.cell_of.clear()
+        self.at.clear()
+
+    def state(self) -> tuple[tuple[int, int], ...]:
+        return tuple(self.cell_of.items())
+
+    def load(self, state: tuple[tuple[int, int], ...]) -> None:
+        # for snapshot restore, same order as the players were tracked in
+        self.clear()
+        at = self.at
+        for p, cell in state:
+            self.cell_of[p] = cell
+            if cell in at:
+                at[cell].append(p)
+            else:
+                at[cell] = [p]
+
+    def players_at(self, cell: int) -> list[int]:
+        return self.at.get(cell, [])
+
+    def within(self, cell: int, r: int) -> list[int]:
+        # players at most r cells away (manhattan), in player order
+        # looks at the cells around when that is less work than looking at every occupied cell
+        cols = self.board.cols
+        cx, cy = cell % cols, cell // cols
+        found: list[int] = []
+        if (2 * r + 1) ** 2 < len(self.at):
+            rows = self.board.rows
+            for y in range(max(cy - r, 0), min(cy + r, rows - 1) + 1):
+                span = r - abs(y - cy)
+                for x in range(max(cx - span, 0), min(cx + span, cols - 1) + 1):
+                    found += self.at.get(y * cols + x, ())
+        else:
+            for c, ps in self.at.items():
+                if abs(c % cols - cx) + abs(c // cols - cy) <= r:
+                    found += ps
+        found.sort()
+        return found
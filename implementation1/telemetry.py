@@ -0,0 +1,76 @@
+# pyright: strict
+import csv, os, time
+from collections import deque
+
+class FrameTimes:
+    # seconds per phase per frame over the last window frames, for the live debug overlay
+    # a phase that runs more than once in a frame (catch-up ticks, one draw call per layer) is summed
+    def __init__(self, window: int = 300, refresh: int = 15):
+        self.window = window
+        self.refresh = refresh # frames between recomputing the percentiles
+        self.frames: deque[dict[str, float]] = deque(maxlen=window)
+        self.current: dict[str, float] = {}
+        self.last: float = 0.0
+        self.count: int = 0 # frames finished so far
+        self._stats: list[tuple[str, float, float, float]] = []
+        self._stats_at: int = -1
+
+    def mark(self) -> None:
+        # start of a run of laps
+        self.last = time.perf_counter()
+
+    def lap(self, name: str) -> None:
+        # time since the last mark or lap goes to name
+        now = time.perf_counter()
+        self.current[name] = self.current.get(name, 0.0) + now - self.last
+        self.last = now
+
+    def add(self, name: str, seconds: float) -> None:
+        self.current[name] = self.current.get(name, 0.0) + seconds
+
+    def end_frame(self) -> None:
+        if self.current:
+            self.current["total"] = sum(self.current.values()) # measured phases only
+        self.frames.append(self.current)
+        self.current = {}
+        self.count += 1
+
+    def stats(self) -> list[tuple[str, float, float, float]]:
+        # (phase, p50, p99, max) in seconds, slowest p99 first, a frame where the phase didn't run counts as 0
+        if self._stats_at >= 0 and self.count - self._stats_at < self.refresh:
+            return self._stats
+        frames = self.frames
+        names: set[str] = set()
+        for f in frames:
+            names.update(f)
+        n = len(frames)
+        stats: list[tuple[str, float, float, float]] = []
+        for name in names:
+            samples = sorted(f.get(name, 0.0) for f in frames)
+            stats.append((name, samples[n // 2], samples[min(n - 1, n * 99 // 100)], samples[-1]))
+        stats.sort(key=lambda s: s[2], reverse=True)
+        self._stats = stats
+        self._stats_at = self.count
+        return stats
+
+    def export_csv(self, path: str) -> str:
+        # one row per frame in the window, one column per phase, milliseconds
+        names = sorted({name for f in self.frames for name in f})
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        first = self.count - len(self.frames)
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", *names])
+            for k, frame in enumerate(self.frames):
+                writer.writerow([first + k, *(f"{frame.get(name, 0.0) * 1e3:.3f}" for name in names)])
+        return path
+
+class NoFrameTimes(FrameTimes):
+    # stands in when there is no window, so the game laps its phases the same way either way
+    def mark(self) -> None:
+        pass
+
+    def lap(self, name: str) -> None:
+        pass
@@ -0,0 +1,46 @@
+# pyright: strict
+
+class FixedTimestep:
+    # game ticks follow the wall clock at a fixed rate, however long update and draw take
+    # a slow frame is paid back with extra ticks on the next one, and the draw of a catch-up frame is skipped
+    def __init__(self, fps: int = 30, max_catchup: int = 5, max_skip: int = 4, snap: float = 0.002):
+        self.dt = 1 / fps
+        self.max_catchup = max_catchup # most ticks one frame may run, past this the game does slow down
+        self.max_skip = max_skip # draws skipped in a row before one is forced
+        self.snap = snap # frame times this close to dt count as exactly dt, so jitter doesn't give 0 then 2 ticks
+        self.acc: float = 0.0
+        self.last: float | None = None
+        self.ticks: int = 0 # ticks to run this frame, from the last advance
+
+        self.skipped: int = 0 # draws dropped so far
+        self.skipped_in_row: int = 0
+        self.lost: float = 0.0 # seconds of game time given up to the catch-up cap
+
+    def advance(self, now: float) -> int:
+        if self.last is None:
+            elapsed = self.dt
+        else:
+            elapsed = now - self.last
+        self.last = now
+        if abs(elapsed - self.dt) < self.snap:
+            elapsed = self.dt
+
+        self.acc += elapsed
+        limit = self.max_catchup * self.dt
+        if self.acc > limit:
+            self.lost += self.acc - limit
+            self.acc = limit
+
+        ticks = int(self.acc / self.dt)
+        self.acc -= ticks * self.dt
+        self.ticks = ticks
+        return ticks
+
+    def should_draw(self) -> bool:
+        # a frame that had to catch up skips its draw, but never more than max_skip in a row
+        if self.ticks > 1 and self.skipped_in_row < self.max_skip:
+            self.skipped += 1
+            self.skipped_in_row += 1
+            return False
+        self.skipped_in_row = 0
+        return True
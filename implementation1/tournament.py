@@ -0,0 +1,191 @@
+# pyright: strict
+import argparse, contextlib, itertools, json, math, os, random, sys, time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+from .model import Model, Bots
+from .headless import HeadlessRunner, HEAD_Y, BLOCK_L
+
+SPEC_DEFAULTS: dict[str, Any] = {
+    "soft_block_percent": 30,
+    "powerup_percent": 75,
+    "timer_seconds": 180,
+    "players": 4,
+    "board_cols": 15,
+    "board_rows": 13,
+    "bot_types": ["hostile", "careful", "greedy"],
+    "rounds": 1000, # total, spread evenly over every lineup
+    "seed": 0,
+}
+
+class Job:
+    # a batch of single rounds for one lineup, small enough to keep every worker busy
+    def __init__(self, lineup: tuple[str, ...], rounds: int, seed: int, spec: dict[str, Any]):
+        self.lineup = lineup
+        self.rounds = rounds
+        self.seed = seed
+        self.spec = spec
+
+def play_job(job: Job) -> tuple[tuple[str, ...], list[tuple[int, int]]]:
+    # runs in a worker process, returns (winner seat or -1 for a draw, ticks) per round
+    settings: dict[str, Any] = {
+        "soft_block_percent": job.spec["soft_block_percent"],
+        "powerup_percent": job.spec["powerup_percent"],
+        "timer_seconds": job.spec["timer_seconds"],
+        "board_cols": job.spec["board_cols"],
+        "board_rows": job.spec["board_rows"],
+        "human_player_number": 0,
+        "total_player_number": len(job.lineup),
+        "bot_types": list(job.lineup),
+        "rounds_to_win": job.rounds + 1, # never end the match, we only want rounds
+    }
+    runner = HeadlessRunner(settings, seed=job.seed)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        runner.play_match(rounds=job.rounds)
+    return job.lineup, [(-1 if r.winner is None else r.winner, r.ticks) for r in runner.results]
+
+def make_jobs(spec: dict[str, Any], chunk: int) -> list[Job]:
+    # every bot type in every seat against every mix of opponents
+    lineups = list(itertools.product(spec["bot_types"], repeat=spec["players"]))
+    # the total is what was asked for, when it doesn't divide evenly the spare rounds go to lineups
+    # picked by the seed, in product order they'd all land on the first bot type in the early seats
+    per_lineup, extra = divmod(spec["rounds"], len(lineups))
+    bonus = set(random.Random(spec["seed"]).sample(range(len(lineups)), extra))
+    jobs: list[Job] = []
+    seed = spec["seed"] * 1_000_003
+    for k, lineup in enumerate(lineups):
+        left = per_lineup + (1 if k in bonus else 0)
+        while left > 0:
+            n = min(chunk, left)
+            jobs.append(Job(lineup, n, seed, spec))
+            seed += 1
+            left -= n
+    return jobs
+
+def wilson(wins: int, n: int, z: float = 1.96) -> tuple[float, float]:
+    # 95% interval for a rate, stays sane near 0 and 1
+    if n == 0:
+        return (0.0, 0.0)
+    phat = wins / n
+    denom = 1 + z * z / n
+    center = (phat + z * z / (2 * n)) / denom
+    half = z * math.sqrt(phat * (1 - phat) / n + z * z / (4 * n * n)) / denom
+    return (center - half, center + half)
+
+def mean_ci(values: list[int], z: float = 1.96) -> tuple[float, float]:
+    n = len(values)
+    if n == 0:
+        return (0.0, 0.0)
+    mean = sum(values) / n
+    if n == 1:
+        return (mean, 0.0)
+    var = sum((v - mean) ** 2 for v in values) / (n - 1)
+    return (mean, z * math.sqrt(var / n))
+
+class Standings:
+    def __init__(self, bot_types: list[str]):
+        self.seats: dict[str, int] = {t: 0 for t in bot_types} # rounds played, counted per seat
+        self.wins: dict[str, int] = {t: 0 for t in bot_types}
+        self.seat_wins: dict[tuple[int, str], list[int]] = {} # (seat, type) -> [wins, rounds]
+        self.rounds = 0
+        self.draws = 0
+        self.lengths: list[int] = []
+
+    def add(self, lineup: tuple[str, ...], results: list[tuple[int, int]]) -> None:
+        for winner, ticks in results:
+            self.rounds += 1
+            self.lengths.append(ticks)
+            for seat, typ in enumerate(lineup):
+                self.seats[typ] += 1
+                entry = self.seat_wins.setdefault((seat, typ), [0, 0])
+                entry[1] += 1
+                if seat == winner:
+                    entry[0] += 1
+            if winner < 0:
+                self.draws += 1
+            else:
+                self.wins[lineup[winner]] += 1
+
+    def to_json(self) -> dict[str, Any]:
+        mean, half = mean_ci(self.lengths)
+        return {
+            "rounds": self.rounds,
+            "draw_rate": self.draws / self.rounds if self.rounds else 0.0,
+            "draw_ci": wilson(self.draws, self.rounds),
+            "round_ticks_mean": mean,
+            "round_ticks_ci": half,
+            "types": {t: {"seats": self.seats[t], "wins": self.wins[t],
+                "win_rate": self.wins[t] / self.seats[t] if self.seats[t] else 0.0,
+                "win_ci": wilson(self.wins[t], self.seats[t])} for t in self.seats},
+            "by_seat": {f"{seat}:{t}": {"wins": w, "rounds": n, "win_ci": wilson(w, n)}
+                for (seat, t), (w, n) in sorted(self.seat_wins.items())},
+        }
+
+    def report(self) -> str:
+        lines: list[str] = []
+        lines.append(f"{'type':10} {'seats':>8} {'wins':>8} {'win rate':>9}  95% ci")
+        for t in self.seats:
+            n, w = self.seats[t], self.wins[t]
+            lo, hi = wilson(w, n)
+            rate = w / n if n else 0.0
+            lines.append(f"{t:10} {n:8} {w:8} {rate:9.3f}  [{lo:.3f}, {hi:.3f}]")
+        lo, hi = wilson(self.draws, self.rounds)
+        rate = self.draws / self.rounds if self.rounds else 0.0
+        lines.append(f"draws: {self.draws}/{self.rounds} = {rate:.3f}  [{lo:.3f}, {hi:.3f}]")
+        mean, half = mean_ci(self.lengths)
+        lines.append(f"round length: {mean:.0f} +- {half:.0f} ticks ({mean / 30:.1f}s)")
+        lines.append("per seat:")
+        for (seat, t), (w, n) in sorted(self.seat_wins.items()):
+            lo, hi = wilson(w, n)
+            lines.append(f"  seat {seat + 1} {t:10} {w:6}/{n:<6} [{lo:.3f}, {hi:.3f}]")
+        return "\n".join(lines)
+
+def load_spec(path: str | None) -> dict[str, Any]:
+    spec = dict(SPEC_DEFAULTS)
+    if path is not None:
+        with open(path, "r") as f:
+            spec.update(json.load(f))
+
+    seats = len(Model(HEAD_Y, BLOCK_L, cols=spec["board_cols"], rows=spec["board_rows"]).spawn_points)
+    if not (2 <= spec["players"] <= seats):
+        print(f"Error: 'players' must be between 2 and {seats}, inclusive.")
+        sys.exit(1)
+    for typ in spec["bot_types"]:
+        if typ not in Bots.BOT_TYPE_INTS:
+            print(f"Error: 'bot_types' must contain only types from {tuple(Bots.BOT_TYPE_INTS)}.")
+            sys.exit(1)
+    return spec
+
+def run_tournament(spec: dict[str, Any], workers: int | None = None, chunk: int = 25) -> Standings:
+    jobs = make_jobs(spec, chunk)
+    standings = Standings(spec["bot_types"])
+    # one process per core, jobs are independent so this scales with cores
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for lineup, results in pool.map(play_job, jobs, chunksize=1):
+            standings.add(lineup, results)
+    return standings
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="All-bot tournament over every seat and lineup.")
+    parser.add_argument("spec", nargs="?", default=None, help="json with the keys of SPEC_DEFAULTS")
+    parser.add_argument("--rounds", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="default is one per core")
+    parser.add_argument("--chunk", type=int, default=25, help="rounds per job")
+    parser.add_argument("--json", default=None, help="also write the standings here")
+    args = parser.parse_args()
+
+    spec = load_spec(args.spec)
+    if args.rounds is not None:
+        spec["rounds"] = args.rounds
+
+    start = time.perf_counter()
+    standings = run_tournament(spec, args.workers, args.chunk)
+    elapsed = time.perf_counter() - start
+
+    print(standings.report())
+    print(f"{standings.rounds} rounds in {elapsed:.1f}s on {args.workers or os.cpu_count()} workers")
+    if args.json is not None:
+        with open(args.json, "w") as f:
+            json.dump(standings.to_json(), f, indent=2)
+
+if __name__ == "__main__":
+    main()
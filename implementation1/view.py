@@ -1,59 +1,80 @@
 # pyright: strict
 import pyxel
+from typing import Iterable
 
 class View:
-    def __init__(self, head_x: int, head_y: int, block_l: int):
+    SPRITES = 4 # player sprites in image bank 1, more players reuse them with a number on top
+
+    def __init__(self, head_x: int, head_y: int, block_l: int, cols: int = 15, rows: int = 13):
         self.head_x = head_x
         self.head_y = head_y
         self.block_l = block_l
-        self.game_x = 15 * block_l
-        self.game_y = 13 * block_l
+        self.game_x = cols * block_l
+        self.game_y = rows * block_l
         self.y_origin = head_y
         self.y_end = self.y_origin + self.game_y
 
-    def draw_background(self):
-        self.bg()
-        self.header()
-        self.floor()
-
-    def bg(self):
-        pyxel.cls(0)
-
-    def header(self):
-        pyxel.rect(0, 0, self.head_x, self.head_y, 12)
-        for i in range(0, self.head_x):
-            for j in range(0, self.head_y):
-                if i == 1 or j == 1 or i == self.head_x - 2 or j == self.head_y - 2:
-                    pyxel.pset(i, j, 3)
-                if i == 0 or j == 0 or i == self.head_x - 1 or j == self.head_y - 1:
-                    pyxel.pset(i, j, 7)
+        # header, floor and every block drawn once into here, destroyed soft blocks are painted over as they go
+        # a pyxel tilemap works in 8 px tiles, our blocks are 10 px, so the layer is a plain image
+        self.static: pyxel.Image | None = None
+        self.static_key: int | None = None
+
+    def draw_board(self, key: int, wall_coords: Iterable[tuple[int, int]], hard_block_coords: Iterable[tuple[int, int]],
+            soft_block_coords: Iterable[tuple[int, int]], soft_cleared: Iterable[tuple[int, int]]):
+        # one blit per frame whatever the board size, baked again only when key (the map version) changes
+        img = self.static
+        if img is None or key != self.static_key:
+            img = self.static = self.bake(wall_coords, hard_block_coords, soft_block_coords)
+            self.static_key = key
+        else:
+            for x, y in soft_cleared:
+                img.rect(x, y, self.block_l, self.block_l, 3)
+        pyxel.blt(0, 0, img, 0, 0, self.head_x, self.y_end)
+
+    def bake(self, wall_coords: Iterable[tuple[int, int]], hard_block_coords: Iterable[tuple[int, int]],
+            soft_block_coords: Iterable[tuple[int, int]]) -> pyxel.Image:
+        img = pyxel.Image(self.head_x, self.y_end)
+        img.cls(0)
+        self.header(img)
+        self.floor(img)
+        self.walls(img, wall_coords)
+        self.hard_blocks(img, hard_block_coords)
+        self.soft_blocks(img, soft_block_coords)
+        return img
+
+    def header(self, img: pyxel.Image):
+        img.rect(0, 0, self.head_x, self.head_y, 12)
+        img.rectb(1, 1, self.head_x - 2, self.head_y - 2, 3)
+        img.rectb(0, 0, self.head_x, self.head_y, 7)
     
-    def floor(self):
-        pyxel.rect(0, self.y_origin, self.game_x, self.game_y, 3)
+    def floor(self, img: pyxel.Image):
+        img.rect(0, self.y_origin, self.game_x, self.game_y, 3)
 
-    def walls(self, wall_coords: set[tuple[int, int]]):
+    def walls(self, img: pyxel.Image, wall_coords: Iterable[tuple[int, int]]):
         for x, y in wall_coords:
-            pyxel.blt(x, y, 0, 0, 0, self.block_l, self.block_l)
+            img.blt(x, y, 0, 0, 0, self.block_l, self.block_l)
 
-    def hard_blocks(self, hard_block_coords: set[tuple[int, int]]):
+    def hard_blocks(self, img: pyxel.Image, hard_block_coords: Iterable[tuple[int, int]]):
         for x, y in hard_block_coords:
-            pyxel.blt(x, y, 0, 0, 0, self.block_l, self.block_l)
+            img.blt(x, y, 0, 0, 0, self.block_l, self.block_l)
 
-    def soft_blocks(self, soft_block_coords: set[tuple[int, int]]):
+    def soft_blocks(self, img: pyxel.Image, soft_block_coords: Iterable[tuple[int, int]]):
         for x, y in soft_block_coords:
-            pyxel.blt(x, y, 0, 16, 0, self.block_l, self.block_l)
+            img.blt(x, y, 0, 16, 0, self.block_l, self.block_l)
 
     def sprites(self, sprite_coords: dict[int, list[int]]):
         for i in sprite_coords:  
             x, y = sprite_coords[i]
-            pyxel.blt(x, y, 1, i * 16, 0, self.block_l, self.block_l, 3) #modify coordinates dito if hindi 10x10 sprite
+            pyxel.blt(x, y, 1, (i % self.SPRITES) * 16, 0, self.block_l, self.block_l, 3) #modify coordinates dito if hindi 10x10 sprite
+            if i >= self.SPRITES:
+                pyxel.text(x + 1, y + 3, str(i + 1), 7)
 
     # functions for bombs
-    def bomb(self, bombs: set[tuple[int, int]]) -> None:
+    def bomb(self, bombs: Iterable[tuple[int, int]]) -> None:
         for x, y in bombs:
             pyxel.blt(x, y, 0, 32, 0, self.block_l, self.block_l, 3)
 
-    def explosions(self, explosions: set[tuple[int, int]]) -> None:
+    def explosions(self, explosions: Iterable[tuple[int, int]]) -> None:
         for x, y in explosions:
             pyxel.blt(x, y, 0, 48, 0, self.block_l, self.block_l, 3)
 
@@ -73,12 +94,16 @@ class View:
 
     def draw_transition(self, round_results: str, round_number: int, round_wins: dict[int, int]):
         pyxel.cls(3)
-        self.header()
+        if self.static is not None:
+            pyxel.blt(0, 0, self.static, 0, 0, self.head_x, self.head_y)
         pyxel.text(self.game_x // 2 - 33, self.head_y // 2 - 2, f"Round {round_number} completed", 7)
         pyxel.text(5, self.head_y + 7, round_results, 7)
         pyxel.text(5, self.head_y + 20, "Current points:", 15)
+        # more columns when the players don't fit under each other
+        per_col = max((self.game_y - 30) // 10, 1)
         for p, wins in round_wins.items():
-            pyxel.text(10, self.head_y + 30 + p * 10, f"Player {p + 1}: {wins} win{"" if wins == 1 else "s"}", 15)
+            col, row = divmod(p, per_col)
+            pyxel.text(10 + col * 70, self.head_y + 30 + row * 10, f"Player {p + 1}: {wins} win{"" if wins == 1 else "s"}", 15)
 
     def draw_countdown(self, time: int):
         if time <= 30:
@@ -88,11 +113,35 @@ class View:
         else:
             pyxel.text(self.game_x // 2 - 12, self.head_y // 2 - 2, "READY", 8)
 
+    def draw_speed(self, speed: int):
+        # right after the timer, before the scores start
+        pyxel.text(26, self.head_y // 2 - 2, f"x{speed}", 10)
+
     def draw_sprite_scores(self, round_wins: dict[int, int]):
+        # 25 px per player like before, squeezed when many players share the header
+        n = max(len(round_wins), 1)
+        width = self.head_x - 40
+        step = min(25, width // n)
+        if step >= 16:
+            for p, wins in round_wins.items():
+                x = 40 + p * step
+                if step == 25:
+                    pyxel.rect(x + 13, self.head_y // 2 - 3, 7, 7, 5)
+                pyxel.blt(x, self.head_y // 2 - 4, 1, (p % self.SPRITES) * 16, 0, self.block_l, self.block_l, 3)
+                pyxel.text(x + (15 if step == 25 else 11), self.head_y // 2 - 2, str(wins), 7)
+            return
+
+        # no room for whole sprites: a slice of the sprite and the wins, up to 3 rows, never past the screen edge
+        rows = min(3, -(-n * 9 // width))
+        per_row = -(-n // rows)
+        step = width // per_row
+        pitch = 5 if rows == 3 else 6
+        top = (self.head_y - rows * pitch) // 2 + 1
         for p, wins in round_wins.items():
-            pyxel.rect(53 + p * 25, self.head_y // 2 - 3, 7, 7, 5)
-            pyxel.blt(40 + p * 25, self.head_y // 2 - 4, 1, p * 16, 0, self.block_l, self.block_l, 3)
-            pyxel.text(55 + p * 25, self.head_y // 2 - 2, str(wins), 7)
+            row, col = divmod(p, per_row)
+            x, y = 40 + col * step, top + row * pitch
+            pyxel.blt(x, y, 1, (p % self.SPRITES) * 16 + 3, 2, 3, 5, 3)
+            pyxel.text(x + 4, y, str(wins), 7)
     
     def powerups(self, powerups: dict[tuple[int, int], str]) -> None:
         SPRITES = {
@@ -146,6 +195,27 @@ class View:
 
                 pyxel.circb(cx, cy, r, 1)
 
+    def draw_timings(self, stats: list[tuple[str, float, float, float]], skipped: int):
+        # slowest phases first in ms, as many as fit on the board, only p99 when the board is narrow
+        rows = min(len(stats), (self.game_y - 16) // 7)
+        x, y = 2, self.y_origin + 2
+        width = min(self.game_x - 4, 132)
+        chars = (width - 4) // 4
+        wide = chars >= 33
+        name_w = 15 if wide else max(chars - 6, 1)
+        pyxel.rect(x, y, width, 16 + rows * 7, 0)
+        if wide:
+            pyxel.text(x + 2, y + 2, f"{"ms":15} {"p50":>5} {"p99":>5} {"max":>5}", 10)
+        else:
+            pyxel.text(x + 2, y + 2, f"{"ms":{name_w}} {"p99":>5}", 10)
+        for k, (name, p50, p99, top) in enumerate(stats[:rows]):
+            if wide:
+                line = f"{name[:15]:15} {p50 * 1e3:5.2f} {p99 * 1e3:5.2f} {top * 1e3:5.2f}"
+            else:
+                line = f"{name[:name_w]:{name_w}} {p99 * 1e3:5.2f}"
+            pyxel.text(x + 2, y + 9 + k * 7, line, 7)
+        pyxel.text(x + 2, y + 9 + rows * 7, f"{"skipped draws" if wide else "skipped"} {skipped}", 8)
+
 class Game_Over_Text:
     @staticmethod
     def its_a_draw() -> str: